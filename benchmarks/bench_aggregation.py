@@ -0,0 +1,93 @@
+"""
+Compares the previous per-method groupby code paths with the shared MonthlyAggregates cube.
+
+Usage:
+    python -m benchmarks.bench_aggregation --rows 1000000
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.synthetic import make_ledger
+from src.analysis.expense_analysis import ExpenseAnalysis
+from src.analysis.monthly_aggregates import MonthlyAggregates
+
+
+def legacy_pipeline(df):
+    """
+    The aggregations previously done by sort_by_category, monthly_summary, savings_recommendations,
+    calculate_monthly_savings_goal_reduction and plot_expenses_vs_income, each on its own.
+    """
+    df = df.copy()
+    # sort_by_category
+    df['Month'] = df['Date'].dt.to_period('M')
+    df.groupby(['Month', 'Category'])['Amount'].sum().reset_index()
+    # monthly_summary and plot_expenses_vs_income
+    for _ in range(2):
+        df['Month'] = df['Date'].dt.to_period('M')
+        df.groupby('Month').agg(
+            total_income=('Amount', lambda x: x[x > 0].sum()),
+            total_expenses=('Amount', lambda x: abs(x[x < 0].sum()))
+        ).reset_index()
+    # savings_recommendations
+    df['Month'] = df['Date'].dt.to_period('M')
+    df[df['Amount'] > 0].groupby('Month')['Amount'].sum()
+    df[df['Amount'] < 0].groupby(['Month', 'Category'])['Amount'].sum().abs()
+    # calculate_monthly_savings_goal_reduction
+    df['Month'] = df['Date'].dt.to_period('M')
+    df[df['Amount'] > 0].groupby('Month')['Amount'].sum()
+    df[df['Amount'] < 0].groupby('Month')['Amount'].sum().abs()
+
+
+def cube_pipeline(df):
+    """
+    The same aggregations answered from one MonthlyAggregates cube.
+    """
+    aggregates = MonthlyAggregates.from_transactions(df)
+    aggregates.category_totals()
+    aggregates.monthly_totals()
+    aggregates.monthly_totals()
+    aggregates.monthly_income()
+    aggregates.category_expenses()
+    aggregates.monthly_income()
+    aggregates.monthly_expenses()
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    df = make_ledger(rows=args.rows, months=args.months)
+
+    legacy = best_of(legacy_pipeline, df, args.repeat)
+    cube = best_of(cube_pipeline, df, args.repeat)
+    print(f"rows={args.rows:,} months={args.months}")
+    print(f"legacy groupbys : {legacy:8.3f} s")
+    print(f"aggregate cube  : {cube:8.3f} s")
+    print(f"speedup         : {legacy / cube:8.1f}x")
+
+    # The full ExpenseAnalysis surface on top of the cube, for reference
+    start = time.perf_counter()
+    analysis = ExpenseAnalysis(df)
+    analysis.sort_by_category()
+    analysis.monthly_summary()
+    analysis.savings_recommendations()
+    analysis.calculate_monthly_savings_goal_reduction()
+    print(f"ExpenseAnalysis : {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
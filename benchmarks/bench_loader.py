@@ -0,0 +1,65 @@
+"""
+Compares date parsing on large messy ledgers: pandas' own inference (the previous loader) against
+parse_dates, which detects one format and parses every distinct date once, and times the plain and
+the validating load of TransactionDataLoader.
+
+Usage:
+    python -m benchmarks.bench_loader --rows 1000000 --error-rate 0.01
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+from benchmarks.synthetic import make_messy_ledger
+from src.utils.expense_utils import TransactionDataLoader, parse_dates
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--formats', default='%Y-%m-%d,%d/%m/%Y', help="comma separated date formats to test")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter('ignore')
+    print(f"rows={args.rows:,} error_rate={args.error_rate}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for date_format in args.formats.split(','):
+            ledger_file = os.path.join(tmp_dir, 'ledger.csv')
+            make_messy_ledger(rows=args.rows, date_format=date_format, error_rate=args.error_rate).to_csv(
+                ledger_file, index=False)
+            raw_dates = pd.read_csv(ledger_file, dtype={'Date': str})['Date']
+
+            inferred, inference = best_of(lambda: pd.to_datetime(raw_dates, errors='coerce'), args.repeat)
+            fast, fast_path = best_of(lambda: parse_dates(raw_dates), args.repeat)
+            _, load = best_of(lambda: TransactionDataLoader(use_cache=False).load_transaction_data(ledger_file),
+                              args.repeat)
+            validated, validate = best_of(
+                lambda: TransactionDataLoader(validate=True).load_transaction_data(ledger_file), args.repeat)
+
+            print(f"\nformat {date_format}")
+            print(f"pandas inference  : {inference:8.3f} s  ({int(inferred.isna().sum()):,} NaT)")
+            print(f"parse_dates       : {fast_path:8.3f} s  ({int(fast.isna().sum()):,} NaT)  "
+                  f"{inference / fast_path:6.1f}x")
+            print(f"load              : {load:8.3f} s")
+            print(f"validated load    : {validate:8.3f} s  rejected {validated.attrs['rejected_rows']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Times every step of the analysis pipeline on synthetic ledgers of several sizes: loading, the
+ExpenseAnalysis methods, the chart and the PDF report. For each step it reports the best wall time,
+the throughput (ledger rows per second) and the peak memory allocated while the step runs.
+
+Usage:
+    python -m benchmarks.bench_pipeline --sizes 10k,1M,10M
+    python -m benchmarks.bench_pipeline --sizes 10k,1M --output results.json
+    python -m benchmarks.bench_pipeline --sizes 10k,1M --baseline benchmarks/baseline.json
+
+With --baseline, exits non-zero when a step is slower, or allocates more, than the stored baseline
+by more than --tolerance. Timings are only comparable on the machine the baseline was recorded on.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_ledger, make_rate_table
+from src.analysis.expense_analysis import ExpenseAnalysis
+from src.utils.currency_utils import CurrencyConverter
+from src.utils.exchange_rate_utils import ExchangeRate
+from src.utils.expense_utils import TransactionDataLoader
+
+DEFAULT_SIZES = '10k,1M,10M'
+DEFAULT_CURRENCIES = 'USD,EUR,GBP'
+# Steps faster than this are too noisy to flag as regressions
+MIN_SECONDS = 0.005
+
+
+def parse_size(text):
+    """
+    Parses a row count such as '10000', '10k' or '1M'.
+    """
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def measure(func, repeat=3, memory=True):
+    """
+    Runs `func` `repeat` times, then once more under tracemalloc when `memory` is set.
+
+    Returns:
+        tuple: (result of the last run, best wall time in seconds, peak traced bytes or None).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        # Traced separately, as tracing slows the allocations down
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def bench_size(rows, tmp_dir, months=36, currencies=(), repeat=3, memory=True):
+    """
+    Benchmarks the pipeline on one synthetic ledger.
+
+    Returns:
+        dict: {step: {'seconds', 'rows_per_second', 'peak_bytes'}} in pipeline order.
+    """
+    from src.reports.expense_report import ReportGenerator
+    from src.visualizations.chart_renderer import ChartRenderer
+    from src.visualizations.expense_visualization import ExpenseVisualization
+
+    ledger_file = os.path.join(tmp_dir, f'ledger_{rows}.csv')
+    make_ledger(rows=rows, months=months, currencies=list(currencies)).to_csv(ledger_file, index=False)
+    converter = None
+    if currencies:
+        rate_file = os.path.join(tmp_dir, 'rates.csv')
+        make_rate_table(currencies, base_currency=currencies[0], months=months).to_csv(rate_file, index=False)
+        converter = CurrencyConverter(ExchangeRate(rate_table=rate_file, offline=True), currencies[0])
+    loader = TransactionDataLoader(use_cache=False, currency_converter=converter, amount_cents=True)
+
+    results = {}
+
+    def step(name, func):
+        result, seconds, peak = measure(func, repeat, memory)
+        results[name] = {'seconds': seconds, 'rows_per_second': rows / seconds if seconds else None,
+                         'peak_bytes': peak}
+        return result
+
+    df = step('load_transaction_data', lambda: loader.load_transaction_data(ledger_file))
+    step('aggregate', lambda: ExpenseAnalysis(df).aggregates)
+    analysis = ExpenseAnalysis(df)
+    analysis.aggregates
+    step('sort_by_category', analysis.sort_by_category)
+    summary_df = step('monthly_summary', analysis.monthly_summary)
+    recommendations = step('savings_recommendations', analysis.savings_recommendations)
+    reductions = step('calculate_monthly_savings_goal_reduction', analysis.calculate_monthly_savings_goal_reduction)
+    # Fresh renderers, so the chart is really drawn instead of served from the renderer's cache
+    chart_file = os.path.join(tmp_dir, 'chart.png')
+    step('plot_expenses_vs_income', lambda: ExpenseVisualization(df, analysis.aggregates).plot_expenses_vs_income(
+        save_path=chart_file, show=False, renderer=ChartRenderer()))
+    report_file = os.path.join(tmp_dir, 'report.pdf')
+    step('generate_pdf_report', lambda: ReportGenerator(renderer=ChartRenderer()).generate_pdf_report(
+        summary_df, recommendations, reductions, file_name=report_file))
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compares benchmark results with a baseline recorded by this script.
+
+    Returns:
+        list: One message per step that is slower, or allocates more, than the baseline allows.
+    """
+    regressions = []
+    for size, steps in results['sizes'].items():
+        for name, current in steps.items():
+            reference = baseline.get('sizes', {}).get(size, {}).get(name)
+            if reference is None:
+                continue
+            limit = reference['seconds'] * (1 + tolerance)
+            if current['seconds'] > limit and current['seconds'] - reference['seconds'] > MIN_SECONDS:
+                regressions.append(f"{name} @ {size} rows: {current['seconds']:.3f}s vs {reference['seconds']:.3f}s")
+            if current['peak_bytes'] and reference.get('peak_bytes') and \
+                    current['peak_bytes'] > reference['peak_bytes'] * (1 + tolerance):
+                regressions.append(f"{name} @ {size} rows: peak {current['peak_bytes'] / 2**20:.1f} MiB vs "
+                                   f"{reference['peak_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+
+def environment():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'machine': platform.machine(), 'system': platform.system()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="comma separated row counts, e.g. 10k,1M,10M")
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--currencies', default=DEFAULT_CURRENCIES,
+                        help="ledger currencies, the first being the base currency; empty for a single currency")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass of every step")
+    parser.add_argument('--output', default=None, help="write the results as JSON (usable as a baseline)")
+    parser.add_argument('--baseline', default=None, help="JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, e.g. 0.25 for 25%%")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    currencies = [currency.strip() for currency in args.currencies.split(',') if currency.strip()]
+    results = {'environment': environment(), 'months': args.months, 'currencies': currencies, 'sizes': {}}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in [parse_size(size) for size in args.sizes.split(',')]:
+            steps = bench_size(rows, tmp_dir, args.months, currencies, args.repeat, not args.no_memory)
+            results['sizes'][str(rows)] = steps
+            reference = (baseline or {}).get('sizes', {}).get(str(rows), {})
+            print(f"\nrows={rows:,}")
+            print(f"{'step':42s} {'seconds':>9s} {'rows/s':>14s} {'peak MiB':>9s} {'vs baseline':>12s}")
+            for name, step in steps.items():
+                peak = f"{step['peak_bytes'] / 2**20:9.1f}" if step['peak_bytes'] is not None else f"{'-':>9s}"
+                ratio = f"{step['seconds'] / reference[name]['seconds']:11.2f}x" if name in reference else f"{'-':>12s}"
+                print(f"{name:42s} {step['seconds']:9.3f} {step['rows_per_second']:14,.0f} {peak} {ratio}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
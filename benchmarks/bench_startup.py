@@ -0,0 +1,76 @@
+"""
+Measures the import time of each entry point in a fresh interpreter and the heavy modules it pulls in.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--budget 0.2]
+
+With --budget, exits non-zero when an entry point that must stay light exceeds the budget (seconds).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'fpdf', 'requests', 'pyarrow']
+
+# Entry point -> heavy modules it is allowed to import when merely imported
+ENTRY_POINTS = {
+    'src.main': [],
+    'src.reports.expense_report': ['numpy'],
+    'src.utils.exchange_rate_utils': [],
+    'src.analysis.expense_analysis': ['pandas', 'numpy', 'pyarrow'],
+    'src.visualizations.expense_visualization': ['pandas', 'numpy', 'pyarrow'],
+    'src.batch': ['pandas', 'numpy', 'pyarrow'],
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(module, repeat=5):
+    """
+    Imports `module` in `repeat` fresh interpreters.
+
+    Returns:
+        dict: Median import time in seconds and the heavy modules that were imported.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output))
+    return {'seconds': statistics.median(run['seconds'] for run in runs), 'heavy': runs[-1]['heavy']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=None,
+                        help="maximum import time for entry points that must not import heavy modules")
+    args = parser.parse_args()
+
+    failures = []
+    for module, allowed in ENTRY_POINTS.items():
+        result = measure(module, args.repeat)
+        unexpected = sorted(set(result['heavy']) - set(allowed))
+        print(f"{module:45s} {result['seconds'] * 1000:8.1f} ms  imports: {', '.join(result['heavy']) or '-'}")
+        if unexpected:
+            failures.append(f"{module} imports {', '.join(unexpected)}")
+        if args.budget is not None and not allowed and result['seconds'] > args.budget:
+            failures.append(f"{module} takes {result['seconds']:.3f}s to import (budget {args.budget}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
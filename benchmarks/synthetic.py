@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_CATEGORIES = ['Salary', 'Rent', 'Groceries', 'Dining', 'Utilities', 'Entertainment', 'Travel', 'Transport']
+
+
+def make_ledger(rows=100_000, months=24, categories=None, start='2022-01-01', income_share=0.1, currencies=None,
+                seed=0):
+    """
+    Generates a synthetic transaction ledger with the same columns as the CSV files in data/.
+
+    Parameters:
+        rows (int): Number of transactions to generate.
+        months (int): Number of calendar months the transactions span.
+        categories (list): Category names; income is booked on the first one.
+        start (str): First day of the ledger.
+        income_share (float): Fraction of rows that are income.
+        currencies (list): Currencies drawn uniformly for a 'Currency' column; no column when omitted.
+        seed (int): Seed for the random generator, so runs are reproducible.
+
+    Returns:
+        DataFrame: A DataFrame with 'Date', 'Category' and 'Amount' columns (and 'Currency' when requested).
+    """
+    categories = list(categories or DEFAULT_CATEGORIES)
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp(start)
+    days = (first + pd.DateOffset(months=months) - first).days
+    dates = first + pd.to_timedelta(rng.integers(0, days, rows), unit='D')
+
+    is_income = rng.random(rows) < income_share
+    category_codes = np.where(is_income, 0, rng.integers(1, max(len(categories), 2), rows))
+    amounts = np.where(is_income, rng.integers(1_000, 5_000, rows), -rng.integers(5, 2_000, rows))
+
+    ledger = pd.DataFrame({
+        'Date': dates,
+        'Category': np.asarray(categories, dtype=object)[np.minimum(category_codes, len(categories) - 1)],
+        'Amount': amounts,
+    })
+    if currencies:
+        ledger['Currency'] = np.asarray(currencies, dtype=object)[rng.integers(0, len(currencies), rows)]
+    return ledger
+
+
+def make_rate_table(currencies, base_currency='USD', months=24, start='2022-01-01', seed=0):
+    """
+    Generates a daily rate table in the format of ExchangeRate's `rate_table` file (date, from, to, rate),
+    covering the dates of a ledger made with the same `months` and `start`.
+
+    Returns:
+        DataFrame: One row per day and currency other than `base_currency`.
+    """
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp(start)
+    dates = pd.date_range(first, first + pd.DateOffset(months=months), freq='D').strftime('%Y-%m-%d')
+    tables = []
+    for currency in currencies:
+        if currency == base_currency:
+            continue
+        # A random walk around a random level, so every day has a plausible, different rate
+        walk = rng.uniform(0.5, 2.0) * np.exp(np.cumsum(rng.normal(0, 0.005, len(dates))))
+        tables.append(pd.DataFrame({'date': dates, 'from': base_currency, 'to': currency, 'rate': walk.round(6)}))
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=['date', 'from', 'to', 'rate'])
+
+
+def make_messy_ledger(rows=100_000, months=24, date_format='%Y-%m-%d', error_rate=0.01, seed=0):
+    """
+    Generates a ledger as raw strings, with a share of broken dates, amounts and categories mixed in,
+    like a hand-edited export.
+
+    Parameters:
+        rows (int): Number of transactions to generate.
+        months (int): Number of calendar months the transactions span.
+        date_format (str): strftime format the dates are written in.
+        error_rate (float): Fraction of rows with one broken field.
+        seed (int): Seed for the random generator, so runs are reproducible.
+
+    Returns:
+        DataFrame: String 'Date', 'Category' and 'Amount' columns, ready to be written with to_csv.
+    """
+    rng = np.random.default_rng(seed)
+    ledger = make_ledger(rows=rows, months=months, seed=seed)
+    messy = pd.DataFrame({
+        'Date': ledger['Date'].dt.strftime(date_format).to_numpy(dtype=object),
+        'Category': ledger['Category'].to_numpy(dtype=object),
+        'Amount': ledger['Amount'].astype(str).to_numpy(dtype=object),
+    })
+    broken = np.flatnonzero(rng.random(rows) < error_rate)
+    kinds = rng.integers(0, 5, len(broken))
+    for kind, column, value in [(0, 'Date', 'n/a'), (1, 'Date', '2023-02-30'), (2, 'Date', None),
+                                (3, 'Amount', 'twelve'), (4, 'Category', None)]:
+        messy.loc[broken[kinds == kind], column] = value
+    return messy
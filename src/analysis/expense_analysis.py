@@ -1,11 +1,88 @@
-import pandas as pd
 import logging
+import threading
+import numpy as np
+import pandas as pd
+from src.analysis.ledger_query import LedgerQuery
+from src.analysis.ledger_view import LedgerView
+from src.analysis.monthly_aggregates import MonthlyAggregates, trailing_sums
+from src.utils.instrumentation import instrumented
+
+DEFAULT_WINDOWS = (3, 6, 12)
 
 class ExpenseAnalysis:
-    def __init__(self, df):
+    def __init__(self, df, aggregates=None, view=None):
+        """
+        The transactions are never written to: derived keys live in a read-only LedgerView and the
+        aggregate cube, both built once on first use, so one analysis can serve several threads.
+
+        Parameters:
+        - df (dataframe): The transactions; may be None when `aggregates` is given.
+        - aggregates (MonthlyAggregates): Optional precomputed cube of the transactions.
+        - view (LedgerView): Optional precomputed keys of the transactions.
+        """
         self.df = df
         self.logger = logging.getLogger(__name__)
+        self._aggregates = aggregates
+        self._view = view
+        self._query = None
+        # Frames added by append_transactions, for the keys and the query index
+        self._appended = []
+        self._lock = threading.RLock()
+
+    @property
+    def view(self):
+        """
+        Read-only month, category and cents keys of the transactions, derived once on first use and
+        again after transactions were appended.
+
+        Raises:
+        - ValueError: If the analysis was built from aggregates alone, without the transactions.
+        """
+        with self._lock:
+            if self._view is None:
+                if self.df is None:
+                    raise ValueError("Transaction keys need the transactions; this analysis only has aggregates")
+                df = pd.concat([self.df] + self._appended, ignore_index=True) if self._appended else self.df
+                self._view = LedgerView.from_transactions(df)
+            return self._view
+
+    @property
+    def query(self):
+        """
+        Indexed LedgerQuery over the transactions for repeated date-range and category questions,
+        built once on first use and again after transactions were appended.
+        """
+        with self._lock:
+            if self._query is None:
+                self._query = LedgerQuery(self.view)
+            return self._query
+
+    @property
+    def aggregates(self):
+        """
+        Month x category x sign aggregate cube, built once from the transactions on first use.
+        """
+        with self._lock:
+            if self._aggregates is None:
+                self._aggregates = MonthlyAggregates.from_view(self.view)
+            return self._aggregates
+
+    def append_transactions(self, df):
+        """
+        Adds new transactions to the analysis without re-aggregating the existing ones.
+
+        The aggregate cube is updated in place; the keys and the query index are rebuilt over all
+        transactions when they are next used.
+
+        Parameters:
+        - df (dataframe): Only the new transactions. The frame passed to the constructor is left untouched.
+        """
+        with self._lock:
+            self._aggregates = self.aggregates.add_transactions(df)
+            self._appended.append(df)
+            self._view = self._query = None
     
+    @instrumented()
     def sort_by_category(self):
         """
         Sorts categories with expenses on monthly basis. 
@@ -14,21 +91,21 @@ class ExpenseAnalysis:
         - sorted_df (dataframe): DF of sorted expenses and income on monthly basis by category.
         """
         try:
-            # Ensure the 'Month' column is derived from the 'Date' column
-            self.df['Month'] = self.df['Date'].dt.to_period('M')
-
-            # Group data by 'Category' and 'Month', summing the 'Amount'
-            grouped_df = self.df.groupby(['Month', 'Category'])['Amount'].sum().reset_index()
+            # Net 'Amount' per 'Month' and 'Category' from the shared aggregate cube
+            grouped_df = self.aggregates.category_totals()
 
             # Sort by 'Month' (ascending) and 'Amount' within each month (ascending)
             sorted_df = grouped_df.sort_values(by=['Month', 'Amount'], ascending=[True, True])
-            self.logger.info("Expenses sorted by category and month:\n%s", sorted_df.to_string(index=False))
+            # Formatting the whole frame is costly, so it only happens when debug output is wanted
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Expenses sorted by category and month:\n%s", sorted_df.to_string(index=False))
             return sorted_df
         except Exception as e:
             self.logger.error(f"Error sorting data by category and month: {e}")
             raise
         
 
+    @instrumented()
     def monthly_summary(self):
         """
        Generates monthly summary of expenses by category by summing them over a month. 
@@ -36,65 +113,88 @@ class ExpenseAnalysis:
         Returns:
         - summary (dataframe): DF of expenses by category by summing them over a month and expense to income ratio.
         """
-        self.df['Month'] = self.df['Date'].dt.to_period('M')
-        summary = self.df.groupby('Month').agg(
-            total_income=('Amount', lambda x: x[x > 0].sum()),
-            total_expenses=('Amount', lambda x: abs(x[x < 0].sum()))
-        ).reset_index()
+        summary = self.aggregates.monthly_totals()
         summary['expense_to_income_ratio'] = summary['total_expenses'] / summary['total_income']
-        self.logger.info("Monthly Summary of Expenses and Income:\n%s", summary.to_string(index=False))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Monthly Summary of Expenses and Income:\n%s", summary.to_string(index=False))
         return summary
 
-    def savings_recommendations(self, income_threshold=0.1, reduction_percentage=0.15):
+    @instrumented()
+    def savings_recommendation_records(self, income_threshold=0.1, reduction_percentage=0.15):
         """
-        Identifies categories with expenses higher than a specified percentage of monthly income 
-        and generates recommendations for reducing these expenses.
+        Identifies categories with expenses higher than a specified percentage of monthly income.
 
         Parameters:
         - income_threshold (float): The allowable maximum percentage of income that can be spent on a category.
         - reduction_percentage (float): The suggested reduction percentage for categories exceeding the threshold.
 
         Returns:
-        - recommendations (list): List of strings containing insights and recommendations.
+        - records (dataframe): One row per (Month, Category) over the threshold with the 'expense', 'income',
+          'expense_ratio', 'excess_percentage' and 'suggested_reduction' (in percent) of that category.
         """
         try:
-            self.df['Date'] = pd.to_datetime(self.df['Date'], errors='coerce')
-            self.df['Month'] = self.df['Date'].dt.to_period('M')
-
-            # Calculate monthly income
-            monthly_income = self.df[self.df['Amount'] > 0].groupby('Month')['Amount'].sum()
-
-            # Calculate monthly expenses per category
-            monthly_expenses = self.df[self.df['Amount'] < 0].groupby(['Month', 'Category'])['Amount'].sum().abs()
-
-            # Generate recommendations
-            recommendations = []
-
-            for month in monthly_income.index:
-                income = monthly_income.get(month, 0)
-                if income > 0:  # Ensure valid income exists for the month
-                    for (m, category), expense in monthly_expenses.items():
-                        if m == month:
-                            expense_ratio = expense / income
-                            if expense_ratio > income_threshold:
-                                excess_percentage = round((expense_ratio - income_threshold) * 100, 2)
-                                reduction_needed = round(reduction_percentage * 100, 2)
-                                recommendations.append(
-                                    f"In {month}, the '{category}' expenses were {excess_percentage}% over the {income_threshold * 100}% "
-                                    f"threshold of monthly income. It is recommended to reduce '{category}' expenses by {reduction_needed}% "
-                                    "to better meet savings goals."
-                                )
-
-            if not recommendations:
-                recommendations.append("All expenses are within the desired limits for each category.")
-
-            self.logger.info("Generated savings recommendations.")
-            return recommendations
+            # Monthly expenses per category, aligned with the income of their month
+            expenses = self.aggregates.category_expenses()
+            income = self.aggregates.monthly_income()
+            month_income = income.reindex(expenses.index.get_level_values('Month')).to_numpy()
+
+            records = expenses.rename('expense').reset_index()
+            records['income'] = month_income
+            records['expense_ratio'] = records['expense'] / records['income']
+            records = records[(records['income'] > 0) & (records['expense_ratio'] > income_threshold)]
+            records = records.reset_index(drop=True)
+
+            records['excess_percentage'] = ((records['expense_ratio'] - income_threshold) * 100).round(2)
+            records['suggested_reduction'] = round(reduction_percentage * 100, 2)
+            return records
 
         except Exception as e:
             self.logger.error(f"Error generating savings recommendations: {e}")
             raise
 
+    @staticmethod
+    def format_recommendations(records, income_threshold=0.1):
+        """
+        Formats savings recommendation records as human readable sentences.
+
+        Parameters:
+        - records (dataframe): Output of savings_recommendation_records.
+        - income_threshold (float): The threshold the records were computed with.
+
+        Returns:
+        - recommendations (list): List of strings containing insights and recommendations.
+        """
+        recommendations = [
+            f"In {month}, the '{category}' expenses were {excess_percentage}% over the {income_threshold * 100}% "
+            f"threshold of monthly income. It is recommended to reduce '{category}' expenses by {reduction_needed}% "
+            "to better meet savings goals."
+            for month, category, excess_percentage, reduction_needed in zip(
+                records['Month'], records['Category'], records['excess_percentage'], records['suggested_reduction']
+            )
+        ]
+        if not recommendations:
+            recommendations.append("All expenses are within the desired limits for each category.")
+        return recommendations
+
+    @instrumented()
+    def savings_recommendations(self, income_threshold=0.1, reduction_percentage=0.15):
+        """
+        Identifies categories with expenses higher than a specified percentage of monthly income 
+        and generates recommendations for reducing these expenses.
+
+        Parameters:
+        - income_threshold (float): The allowable maximum percentage of income that can be spent on a category.
+        - reduction_percentage (float): The suggested reduction percentage for categories exceeding the threshold.
+
+        Returns:
+        - recommendations (list): List of strings containing insights and recommendations.
+        """
+        records = self.savings_recommendation_records(income_threshold, reduction_percentage)
+        recommendations = self.format_recommendations(records, income_threshold)
+        self.logger.info("Generated savings recommendations.")
+        return recommendations
+
+    @instrumented()
     def calculate_monthly_savings_goal_reduction(self, savings_goal=500):
         """
         Calculates the proportion by which monthly expenses need to be reduced to meet a specified savings goal for each month.
@@ -106,29 +206,18 @@ class ExpenseAnalysis:
         - dict: A dictionary where keys are months, and values are the percentage reduction needed or a message indicating no reduction is required.
         """
         try:
-            # Ensure 'Date' is a datetime type and create a 'Month' column
-            self.df['Date'] = pd.to_datetime(self.df['Date'])
-            self.df['Month'] = self.df['Date'].dt.to_period('M')
-
-            # Calculate monthly income and expenses
-            monthly_income = self.df[self.df['Amount'] > 0].groupby('Month')['Amount'].sum()
-            monthly_expenses = self.df[self.df['Amount'] < 0].groupby('Month')['Amount'].sum().abs()
-
+            reductions = self.savings_goal_matrix([savings_goal]).iloc[0]
             monthly_reductions = {}
 
-            for month in monthly_income.index:
-                income = monthly_income.get(month, 0)
-                if income > 0:
-                    monthly_expense_after_savings = income - savings_goal
-                    total_expenses = monthly_expenses.get(month, 0)
-
-                    if total_expenses > monthly_expense_after_savings:
-                        reduction_needed = ((total_expenses - monthly_expense_after_savings) / total_expenses) * 100
-                        self.logger.info(f"Month {month}: Calculated reduction needed: {reduction_needed:.2f}% to meet savings goal.")
-                        monthly_reductions[month] = f"A reduction of {reduction_needed:.2f}% in total expenses is needed to meet the savings goal."
-                    else:
-                        self.logger.info(f"Month {month}: No reduction needed; total expenses are within the savings goal.")
-                        monthly_reductions[month] = "No reduction needed; expenses are already within the savings goal."
+            # Months with income, as before; the matrix marks the others with NaN
+            for month in self.aggregates.monthly_income().index:
+                reduction_needed = reductions[month]
+                if reduction_needed > 0:
+                    self.logger.info(f"Month {month}: Calculated reduction needed: {reduction_needed:.2f}% to meet savings goal.")
+                    monthly_reductions[month] = f"A reduction of {reduction_needed:.2f}% in total expenses is needed to meet the savings goal."
+                elif reduction_needed == 0:
+                    self.logger.info(f"Month {month}: No reduction needed; total expenses are within the savings goal.")
+                    monthly_reductions[month] = "No reduction needed; expenses are already within the savings goal."
                 else:
                     self.logger.info(f"Month {month}: Zero income, cannot calculate a meaningful reduction.")
                     monthly_reductions[month] = "Zero income for this month; unable to calculate expense reduction."
@@ -139,5 +228,113 @@ class ExpenseAnalysis:
             self.logger.error(f"Error calculating monthly savings goal reduction: {e}")
             raise
 
+    @instrumented()
+    def savings_goal_matrix(self, savings_goals):
+        """
+        What-if solver: the expense reduction every month needs for each of many savings goals.
+
+        The goals x months matrix is computed in one broadcasted operation over the monthly totals.
+
+        Parameters:
+        - savings_goals (array-like): Monthly savings goals to compare.
+
+        Returns:
+        - reductions (dataframe): Goals (index 'savings_goal') x months; the percentage by which total
+          expenses must shrink to meet the goal, 0 where they already do, NaN for months without income
+          and inf where the goal exceeds the income even without expenses.
+        """
+        totals = self.aggregates.monthly_totals()
+        goals = np.asarray(savings_goals, dtype='float64').reshape(-1, 1)
+        income = totals['total_income'].to_numpy()[None, :]
+        expenses = totals['total_expenses'].to_numpy()[None, :]
+
+        allowed_expenses = income - goals
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reductions = np.where(expenses > allowed_expenses, ((expenses - allowed_expenses) / expenses) * 100, 0.0)
+        reductions = np.where(income > 0, reductions, np.nan)
+        return pd.DataFrame(reductions, index=pd.Index(goals.ravel(), name='savings_goal'),
+                            columns=pd.PeriodIndex(totals['Month'], name='Month'))
+
+    @instrumented()
+    def income_threshold_matrix(self, income_thresholds):
+        """
+        What-if solver: the categories over each of many income thresholds, in one broadcasted operation.
+
+        Parameters:
+        - income_thresholds (array-like): Allowable shares of monthly income per category, e.g. [0.05, 0.1, 0.2].
+
+        Returns:
+        - excess (dataframe): One row per ('Month', 'Category') with expenses in a month with income, one
+          column per threshold (columns 'income_threshold'); the percentage points the category is over
+          that threshold, as in savings_recommendation_records, or NaN where it is within it.
+        """
+        expenses = self.aggregates.category_expenses()
+        income = self.aggregates.monthly_income()
+        month_income = income.reindex(expenses.index.get_level_values('Month')).to_numpy()
+        with_income = month_income > 0
+        ratios = (expenses.to_numpy()[with_income] / month_income[with_income])[:, None]
+
+        thresholds = np.asarray(income_thresholds, dtype='float64').ravel()
+        excess = np.where(ratios > thresholds[None, :], ((ratios - thresholds[None, :]) * 100).round(2), np.nan)
+        return pd.DataFrame(excess, index=expenses.index[with_income],
+                            columns=pd.Index(thresholds, name='income_threshold'))
+
+    @instrumented()
+    def rolling_category_averages(self, windows=DEFAULT_WINDOWS):
+        """
+        Trailing average monthly expenses of every category over several window sizes.
+
+        All windows come from one cumulative sum over the calendar months x categories cube, so the
+        cost is linear in the number of months for every window. Months without transactions count as
+        zero spending; the first months of the ledger average over the shorter history available.
+
+        Parameters:
+        - windows (iterable): Window sizes in months, e.g. (3, 6, 12).
 
+        Returns:
+        - rolling (dataframe): 'Month', 'Category', that month's 'expense' and one 'avg_<N>m' column per
+          window, for every month and category with spending in the longest window.
+        """
+        windows = sorted(set(windows))
+        matrix = self.aggregates.category_expense_cents()
+        sums = trailing_sums(matrix.to_numpy(), windows)
+        months_seen = np.arange(1, len(matrix) + 1)[:, None]
+
+        rolling = pd.DataFrame({
+            'Month': np.repeat(matrix.index.to_numpy(), matrix.shape[1]),
+            'Category': np.tile(matrix.columns.to_numpy(dtype=object), len(matrix)),
+            'expense': matrix.to_numpy().ravel() / 100,
+        })
+        for window in windows:
+            rolling[f'avg_{window}m'] = (sums[window] / np.minimum(months_seen, window)).ravel() / 100
+        if windows:
+            rolling = rolling[sums[windows[-1]].ravel() > 0].reset_index(drop=True)
+        return rolling
+
+    @instrumented()
+    def rolling_expense_ratios(self, windows=DEFAULT_WINDOWS):
+        """
+        Trailing expense-to-income ratios over several window sizes, for budget alerts.
+
+        Parameters:
+        - windows (iterable): Window sizes in months, e.g. (3, 6, 12).
+
+        Returns:
+        - ratios (dataframe): 'Month', 'total_income', 'total_expenses' and one 'ratio_<N>m' column per window
+          (expenses over income of the last N calendar months; NaN without income in the window).
+        """
+        windows = sorted(set(windows))
+        monthly = self.aggregates.monthly_cents()
+        income = trailing_sums(monthly['income'].to_numpy(), windows)
+        expenses = trailing_sums(monthly['expenses'].to_numpy(), windows)
 
+        ratios = pd.DataFrame({
+            'Month': monthly.index,
+            'total_income': monthly['income'].to_numpy() / 100,
+            'total_expenses': monthly['expenses'].to_numpy() / 100,
+        })
+        for window in windows:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = expenses[window] / income[window]
+            ratios[f'ratio_{window}m'] = np.where(income[window] > 0, ratio, np.nan)
+        return ratios
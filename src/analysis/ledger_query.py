@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from src.analysis.ledger_view import LedgerView
+
+
+def _day(value):
+    # Day number (days since 1970-01-01) of a date given as a string, date or Timestamp
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype('int64'))
+
+
+class _Index:
+    """
+    Transactions sorted by day with prefix sums of their expense and income cents.
+    """
+
+    def __init__(self, days, cents):
+        self.days = days
+        self.expenses = np.concatenate([[0], np.cumsum(np.where(cents < 0, -cents, 0))])
+        self.income = np.concatenate([[0], np.cumsum(np.where(cents > 0, cents, 0))])
+
+    def bounds(self, start=None, end=None):
+        low = 0 if start is None else np.searchsorted(self.days, _day(start), side='left')
+        high = len(self.days) if end is None else np.searchsorted(self.days, _day(end), side='right')
+        return low, max(low, high)
+
+    def sums(self, edges):
+        """
+        Returns the expense and income cents between consecutive day `edges` (an ascending array).
+        """
+        positions = np.searchsorted(self.days, edges, side='left')
+        return np.diff(self.expenses[positions]), np.diff(self.income[positions])
+
+
+class LedgerQuery:
+    """
+    Indexed, read-only query layer for repeated ad-hoc questions about one loaded ledger.
+
+    The transactions are sorted once by (category, day) and by day, with prefix sums of the expense
+    and income cents. A date range is then found by binary search and its total is the difference of
+    two prefix sums, so every query costs O(log n) instead of a scan and groupby of the whole frame.
+    Rows without a date are not indexed, like in every other analysis.
+    """
+
+    def __init__(self, view):
+        """
+        Parameters:
+        - view (LedgerView): Read-only keys of the transactions, with their days.
+        """
+        if view.days is None:
+            raise ValueError("LedgerQuery needs a LedgerView with days.")
+        dated = view.month_codes >= 0
+        days = view.days[dated].astype('int64')
+        cents = view.cents[dated].astype('int64')
+        category_codes = view.category_codes[dated]
+
+        by_day = np.argsort(days, kind='stable')
+        self._all = _Index(days[by_day], cents[by_day])
+
+        # One sort of packed (category, day) keys instead of a two-key lexsort
+        by_category = np.argsort((category_codes.astype('int64') << 32) | (days - days.min() if len(days) else days),
+                                 kind='stable')
+        sorted_codes = category_codes[by_category]
+        sorted_days = days[by_category]
+        sorted_cents = cents[by_category]
+        self.categories = {}
+        for code, label in enumerate(view.categories):
+            low, high = np.searchsorted(sorted_codes, [code, code + 1])
+            if high > low:
+                self.categories[label] = _Index(sorted_days[low:high], sorted_cents[low:high])
+
+        # Calendar months of the whole ledger, reused by the monthly queries without a date range
+        self._months = self._month_edges(None, None)
+
+    def _month_edges(self, start, end):
+        days = self._all.days
+        empty = pd.PeriodIndex([], freq='M'), np.zeros(1, dtype='int64')
+        if len(days) == 0:
+            return empty
+        first = pd.Timestamp(start if start is not None else days[0].astype('datetime64[D]'))
+        last = pd.Timestamp(end if end is not None else days[-1].astype('datetime64[D]'))
+        # A reversed range is empty, like in spend()
+        if first.normalize() > last.normalize():
+            return empty
+        months = pd.period_range(first, last, freq='M')
+        # Daily period ordinals are day numbers, so the month boundaries need no date arithmetic
+        edges = np.append(months.asfreq('D', how='start').asi8, months[-1].asfreq('D', how='end').ordinal + 1)
+        # Partial first and last months only cover the requested range
+        edges[0] = _day(first)
+        edges[-1] = _day(last) + 1
+        return months, edges
+
+    def _monthly(self, category, start, end):
+        months, edges = self._months if start is None and end is None else self._month_edges(start, end)
+        _, income = self._all.sums(edges)
+        index = self._index(category)
+        expense = index.sums(edges)[0] if index is not None else np.zeros(len(months), dtype='int64')
+        return months, expense, income
+
+    @classmethod
+    def from_transactions(cls, df):
+        """
+        Indexes a transaction DataFrame; see LedgerView.from_transactions for the expected columns.
+        """
+        return cls(LedgerView.from_transactions(df))
+
+    def _index(self, category):
+        return self._all if category is None else self.categories.get(category)
+
+    def spend(self, category=None, start=None, end=None):
+        """
+        Returns the absolute expenses of a category (all categories when None) from `start` to `end`.
+
+        Parameters:
+        - category (str): Category label; unknown categories have spent nothing.
+        - start, end (str, date or Timestamp): Inclusive date range; open-ended when None.
+
+        Returns:
+        - float: The expenses in currency units.
+        """
+        index = self._index(category)
+        if index is None:
+            return 0.0
+        low, high = index.bounds(start, end)
+        return int(index.expenses[high] - index.expenses[low]) / 100
+
+    def income(self, category=None, start=None, end=None):
+        """
+        Returns the income booked on a category (all categories when None) from `start` to `end`, inclusive.
+        """
+        index = self._index(category)
+        if index is None:
+            return 0.0
+        low, high = index.bounds(start, end)
+        return int(index.income[high] - index.income[low]) / 100
+
+    def count(self, category=None, start=None, end=None):
+        """
+        Returns the number of transactions of a category (all categories when None) from `start` to `end`.
+        """
+        index = self._index(category)
+        if index is None:
+            return 0
+        low, high = index.bounds(start, end)
+        return int(high - low)
+
+    def monthly_spend(self, category=None, start=None, end=None):
+        """
+        Returns:
+        - dataframe: 'Month', 'expense' of the category and 'income' of the whole ledger for every calendar
+          month from `start` (or the first transaction) to `end` (or the last transaction).
+        """
+        months, expense, income = self._monthly(category, start, end)
+        return pd.DataFrame({'Month': months, 'expense': expense / 100, 'income': income / 100})
+
+    def months_exceeding(self, category, share, start=None, end=None):
+        """
+        Finds the months in which a category's expenses exceeded a share of that month's income.
+
+        Parameters:
+        - category (str): Category label, e.g. 'Rent'.
+        - share (float): Share of monthly income, e.g. 0.3 for 30%.
+        - start, end (str, date or Timestamp): Optional inclusive date range.
+
+        Returns:
+        - dataframe: 'Month', 'expense', 'income' and 'share' of the months over the limit; months
+          without income count as exceeded when anything was spent.
+        """
+        months, expense, income = self._monthly(category, start, end)
+        over = (expense > share * income) & (expense > 0)
+        expense, income = expense[over], income[over]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(income > 0, expense / income, np.nan)
+        return pd.DataFrame({'Month': months[over], 'expense': expense / 100, 'income': income / 100,
+                             'share': ratio})
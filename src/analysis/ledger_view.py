@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from src.utils.money import transaction_cents
+
+UNCATEGORIZED = 'Uncategorized'
+# datetime64 NaT viewed as an integer
+_NAT = np.iinfo(np.int64).min
+# Day number of rows without a date
+NO_DAY = np.iinfo(np.int32).min
+
+
+def _read_only(values):
+    # A read-only view shares memory with the source frame, so nothing is copied
+    view = np.asarray(values).view()
+    view.flags.writeable = False
+    return view
+
+
+class LedgerView:
+    """
+    Read-only integer keys of a transaction frame: days, month codes, category codes and amounts in cents.
+
+    The keys are derived once from the frame without writing to it, and every array is read-only,
+    so one view can be shared by the analysis, visualization and report code, also across threads.
+    """
+
+    def __init__(self, month_codes, first_month, category_codes, categories, cents, days=None):
+        """
+        Parameters:
+        - month_codes (ndarray): int32 month of every row, counted from `first_month`; -1 for rows without a date.
+        - first_month (int): Month ordinal (months since 1970-01) of month code 0.
+        - category_codes (ndarray): int32 position of every row's category in `categories`; -1 when missing.
+        - categories (ndarray): The distinct category labels.
+        - cents (ndarray): Integer amount of every row in cents.
+        - days (ndarray): Optional int32 date of every row as days since 1970-01-01; NO_DAY for rows without a date.
+        """
+        self.month_codes = _read_only(month_codes)
+        self.first_month = int(first_month)
+        self.category_codes = _read_only(category_codes)
+        self.categories = _read_only(categories)
+        self.cents = _read_only(cents)
+        self.days = None if days is None else _read_only(days)
+
+    @classmethod
+    def from_transactions(cls, df):
+        """
+        Derives the keys of a transaction DataFrame, leaving the frame untouched.
+
+        Parameters:
+        - df (dataframe): Transactions with 'Date', 'Amount' (or integer 'AmountCents') and an optional 'Category' column.
+
+        Returns:
+        - LedgerView: The read-only keys of every row.
+        """
+        dates = df['Date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').view('int64')
+        months = days.astype('datetime64[D]').astype('datetime64[M]').view('int64')
+        dated = months != _NAT
+        first_month = int(months[dated].min()) if dated.any() else 0
+        month_codes = np.where(dated, months - first_month, -1).astype('int32')
+
+        if 'Category' not in df.columns:
+            category_codes = np.zeros(len(df), dtype='int32')
+            categories = np.array([UNCATEGORIZED], dtype=object)
+        elif isinstance(df['Category'].dtype, pd.CategoricalDtype):
+            # Categorical columns (e.g. streamed chunks) already carry their codes
+            category_codes = df['Category'].cat.codes.to_numpy().astype('int32', copy=False)
+            categories = df['Category'].cat.categories.to_numpy(dtype=object)
+        else:
+            codes, labels = pd.factorize(df['Category'], sort=True)
+            category_codes = codes.astype('int32', copy=False)
+            categories = np.asarray(labels, dtype=object)
+
+        days = np.where(dated, days, NO_DAY).astype('int32')
+        return cls(month_codes, first_month, category_codes, categories, transaction_cents(df).to_numpy(), days)
+
+    def __len__(self):
+        return len(self.cents)
+
+    @property
+    def month_count(self):
+        """
+        Returns:
+        - int: Number of months from the first to the last dated transaction.
+        """
+        return int(self.month_codes.max()) + 1 if len(self) else 0
+
+    def months(self):
+        """
+        Returns:
+        - PeriodIndex: The monthly period of every month code.
+        """
+        return pd.PeriodIndex.from_ordinals(np.arange(self.month_count) + self.first_month, freq='M')
+
+    def aggregate(self):
+        """
+        Sums the cents and counts the rows per (Month, Category, Sign) with one integer groupby.
+
+        Every (month, category, sign) triple is packed into a single int64 key, so the grouping never
+        touches labels and the sums stay exact 64-bit integers. Rows without a date are skipped.
+
+        Returns:
+        - dataframe: 'cents' and 'count' columns indexed by (Month, Category, Sign), sorted, missing
+          categories last.
+        """
+        dated = self.month_codes >= 0
+        # Missing categories get the last code so they sort after every label
+        missing = len(self.categories)
+        category_codes = np.where(self.category_codes >= 0, self.category_codes, missing)[dated].astype('int64')
+        cents = self.cents[dated].astype('int64')
+        signs = np.sign(cents) + 1
+        keys = (self.month_codes[dated].astype('int64') * (missing + 1) + category_codes) * 3 + signs
+
+        cube = pd.Series(cents).groupby(keys, sort=True).agg(['sum', 'count'])
+        keys = cube.index.to_numpy()
+        month_codes, rest = np.divmod(keys, (missing + 1) * 3)
+        category_codes, signs = np.divmod(rest, 3)
+        labels = np.append(self.categories, np.nan).astype(object)
+        index = pd.MultiIndex.from_arrays([
+            pd.PeriodIndex.from_ordinals(month_codes + self.first_month, freq='M'),
+            pd.Index(labels[category_codes], dtype=object),
+            pd.Index((signs - 1).astype('int8')),
+        ], names=['Month', 'Category', 'Sign'])
+        return pd.DataFrame({'cents': cube['sum'].to_numpy(), 'count': cube['count'].to_numpy()}, index=index)
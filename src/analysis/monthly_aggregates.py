@@ -0,0 +1,276 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import logging
+from src.analysis.ledger_view import LedgerView
+from src.utils.money import from_cents
+
+STATE_VERSION = 2
+
+
+def trailing_sums(values, windows):
+    """
+    Sums every row of `values` with the rows before it over several window sizes, from one cumulative sum.
+
+    Parameters:
+    - values (ndarray): Rows in month order, e.g. a dense months x categories matrix of cents.
+    - windows (iterable): Window sizes in rows; the first rows use the shorter history available.
+
+    Returns:
+    - dict: {window: ndarray shaped like `values` with the trailing sums}; the cost is linear in the
+      size of `values` for every window, instead of re-aggregating every slice.
+    """
+    values = np.asarray(values)
+    cumulative = np.zeros((len(values) + 1,) + values.shape[1:], dtype=values.dtype)
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    ends = np.arange(1, len(values) + 1)
+    return {window: cumulative[ends] - cumulative[np.maximum(ends - window, 0)] for window in windows}
+
+
+class MonthlyAggregates:
+    """
+    Aggregate cube of transaction amounts keyed by (Month, Category, Sign).
+
+    The cube is built in a single vectorized groupby over the transactions and is then shared by
+    the analysis, visualization and report code, which only ever look at the (small) cube instead
+    of rescanning the full transaction frame. Amounts are summed as 64-bit integer cents, so totals
+    are exact; the views convert them back to currency units.
+    """
+
+    INDEX = ['Month', 'Category', 'Sign']
+
+    def __init__(self, cube, metadata=None):
+        """
+        Parameters:
+        - cube (dataframe): 'cents' (int64) and 'count' columns indexed by (Month, Category, Sign).
+        - metadata (dict): JSON serializable bookkeeping saved with the cube, e.g. how far a source file was read.
+        """
+        self.cube = cube
+        self.metadata = dict(metadata or {})
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_transactions(cls, df):
+        """
+        Builds the aggregate cube from a transaction DataFrame.
+
+        Parameters:
+        - df (dataframe): Transactions with 'Date', 'Amount' (or integer 'AmountCents') and an optional 'Category' column.
+
+        Returns:
+        - MonthlyAggregates: Cube with the summed amount and row count per (Month, Category, Sign).
+        """
+        return cls.from_view(LedgerView.from_transactions(df))
+
+    @classmethod
+    def from_view(cls, view):
+        """
+        Builds the aggregate cube from the read-only keys of a transaction frame.
+
+        Parameters:
+        - view (LedgerView): Month, category and cents keys of the transactions.
+
+        Returns:
+        - MonthlyAggregates: Cube with the summed amount and row count per (Month, Category, Sign).
+        """
+        return cls(view.aggregate())
+
+    @classmethod
+    def empty(cls):
+        """
+        Returns:
+        - MonthlyAggregates: A cube without any transactions.
+        """
+        return cls.from_transactions(pd.DataFrame({
+            'Date': pd.Series(dtype='datetime64[ns]'),
+            'Category': pd.Series(dtype=object),
+            'Amount': pd.Series(dtype='float64'),
+        }))
+
+    @classmethod
+    def concat(cls, parts):
+        """
+        Folds several cubes (e.g. one per chunk or per file) into one.
+
+        Parameters:
+        - parts (iterable): MonthlyAggregates instances.
+
+        Returns:
+        - MonthlyAggregates: Cube with cents and counts summed per (Month, Category, Sign).
+        """
+        cubes = [part.cube for part in parts]
+        cube = pd.concat(cubes).groupby(level=cls.INDEX, sort=True, dropna=False).sum()
+        return cls(cube)
+
+    def combine(self, other):
+        """
+        Returns:
+        - MonthlyAggregates: A new cube holding the transactions of both this cube and `other`.
+        """
+        return MonthlyAggregates.concat([self, other])
+
+    def add_transactions(self, df):
+        """
+        Folds new transactions into the cube without touching the transactions already aggregated.
+
+        Parameters:
+        - df (dataframe): Only the new transactions.
+
+        Returns:
+        - MonthlyAggregates: The updated cube; the cost is proportional to `df` and the size of the cube.
+        """
+        updated = self.combine(MonthlyAggregates.from_transactions(df))
+        updated.metadata = dict(self.metadata)
+        return updated
+
+    @property
+    def rows(self):
+        """
+        Returns:
+        - int: Number of transactions with a valid date aggregated in the cube.
+        """
+        return int(self.cube['count'].sum())
+
+    def save(self, path):
+        """
+        Persists the cube and its metadata as JSON, replacing `path` atomically.
+
+        Parameters:
+        - path (str): The state file to write.
+        """
+        cube = self.cube.reset_index()
+        state = {
+            'version': STATE_VERSION,
+            'metadata': self.metadata,
+            'cube': {
+                'Month': cube['Month'].astype(str).tolist(),
+                'Category': cube['Category'].astype(object).where(cube['Category'].notna(), None).tolist(),
+                'Sign': cube['Sign'].tolist(),
+                'cents': cube['cents'].tolist(),
+                'count': cube['count'].tolist(),
+            },
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+        self.logger.info(f"Aggregate state saved to {path} ({len(cube)} groups).")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a cube persisted with `save`.
+
+        Parameters:
+        - path (str): The state file to read.
+
+        Returns:
+        - MonthlyAggregates: The persisted cube with its metadata.
+        """
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('version') not in (1, STATE_VERSION):
+            raise ValueError(f"Unsupported aggregate state version in {path}: {state.get('version')}")
+        columns = state['cube']
+        if state['version'] == 1:
+            # Version 1 stored amounts in currency units
+            columns['cents'] = np.rint(np.asarray(columns.pop('amount'), dtype='float64') * 100)
+        cube = pd.DataFrame({
+            'Month': pd.PeriodIndex(columns['Month'], freq='M'),
+            'Category': pd.Series(columns['Category'], dtype=object),
+            'Sign': pd.Series(columns['Sign'], dtype='int8'),
+            'cents': np.asarray(columns['cents'], dtype='int64'),
+            'count': np.asarray(columns['count'], dtype='int64'),
+        }).set_index(cls.INDEX)
+        return cls(cube, state.get('metadata'))
+
+    def _by_sign(self):
+        by_sign = self.cube['cents'].groupby(level=['Month', 'Sign']).sum().unstack('Sign', fill_value=0)
+        return by_sign.reindex(columns=[-1, 0, 1], fill_value=0)
+
+    def months(self):
+        """
+        Returns:
+        - PeriodIndex: All months that have at least one transaction.
+        """
+        return self.cube.index.get_level_values('Month').unique()
+
+    def category_totals(self):
+        """
+        Returns:
+        - dataframe: Net 'Amount' per 'Month' and 'Category'.
+        """
+        totals = self.cube['cents'].groupby(level=['Month', 'Category']).sum()
+        totals = totals[totals.index.get_level_values('Category').notna()]
+        return pd.Series(from_cents(totals), index=totals.index, name='Amount').reset_index()
+
+    def monthly_totals(self):
+        """
+        Returns:
+        - dataframe: 'Month', 'total_income' and 'total_expenses' for every month with transactions.
+        """
+        by_sign = self._by_sign()
+        return pd.DataFrame({
+            'Month': by_sign.index,
+            'total_income': from_cents(by_sign[1]),
+            'total_expenses': from_cents(-by_sign[-1]),
+        })
+
+    def monthly_income(self):
+        """
+        Returns:
+        - Series: Total income per month, for months with any income.
+        """
+        income = self._by_sign()[1]
+        income = income[income > 0]
+        return pd.Series(from_cents(income), index=income.index, name='total_income')
+
+    def monthly_expenses(self):
+        """
+        Returns:
+        - Series: Absolute total expenses per month, for months with any expenses.
+        """
+        expenses = self._by_sign()[-1]
+        expenses = expenses[expenses < 0]
+        return pd.Series(from_cents(-expenses), index=expenses.index, name='total_expenses')
+
+    def calendar_months(self):
+        """
+        Returns:
+        - PeriodIndex: Every calendar month from the first to the last month with transactions, gaps included.
+        """
+        months = self.months()
+        if len(months) == 0:
+            return pd.PeriodIndex([], freq='M', name='Month')
+        return pd.period_range(months.min(), months.max(), freq='M', name='Month')
+
+    def monthly_cents(self):
+        """
+        Returns:
+        - dataframe: Integer 'income' and absolute 'expenses' cents for every calendar month (see calendar_months).
+        """
+        by_sign = self._by_sign().reindex(self.calendar_months(), fill_value=0)
+        return pd.DataFrame({'income': by_sign[1].to_numpy(), 'expenses': -by_sign[-1].to_numpy()},
+                            index=by_sign.index)
+
+    def category_expense_cents(self):
+        """
+        Returns:
+        - dataframe: Dense calendar months x categories matrix of absolute expense cents, zero where nothing was spent.
+        """
+        index = self.cube.index
+        mask = (index.get_level_values('Sign') == -1) & index.get_level_values('Category').notna()
+        expenses = -self.cube.loc[mask, 'cents'].droplevel('Sign')
+        matrix = expenses.unstack('Category', fill_value=0) if len(expenses) else pd.DataFrame(dtype='int64')
+        return matrix.sort_index(axis=1).reindex(self.calendar_months(), fill_value=0).astype('int64')
+
+    def category_expenses(self):
+        """
+        Returns:
+        - Series: Absolute expenses per ('Month', 'Category'), for categories with any expenses in that month.
+        """
+        index = self.cube.index
+        mask = (index.get_level_values('Sign') == -1) & index.get_level_values('Category').notna()
+        expenses = self.cube.loc[mask, 'cents'].droplevel('Sign')
+        return pd.Series(from_cents(-expenses), index=expenses.index, name='expense')
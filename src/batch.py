@@ -0,0 +1,254 @@
+import argparse
+import glob
+import logging
+import os
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from src.analysis.expense_analysis import ExpenseAnalysis
+from src.utils.currency_utils import CurrencyConverter
+from src.utils.exchange_rate_utils import ExchangeRate
+from src.utils.expense_utils import CACHE_SUFFIX, QUARANTINE_SUFFIX, TransactionDataLoader
+from src.utils.instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Stages of the single-file pipeline that apply to every ledger of a batch
+LEDGER_STAGES = ('summary', 'recommendations', 'goal', 'rolling', 'chart', 'report')
+DEFAULT_STAGES = ('summary', 'recommendations', 'goal', 'report')
+
+
+def discover_ledgers(inputs):
+    """
+    Expands directories (all *.csv files in them) and glob patterns into a sorted list of ledger files.
+    Quarantine and cache files written next to the ledgers are not ledgers and are skipped.
+
+    Parameters:
+        inputs (list): File paths, directories or glob patterns.
+
+    Returns:
+        list: Paths of the transaction files to process, without duplicates.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            found = glob.glob(os.path.join(item, '*.csv'))
+        elif glob.has_magic(item):
+            found = glob.glob(item, recursive=True)
+        else:
+            paths.append(item)
+            continue
+        paths.extend(path for path in found if not path.endswith((QUARANTINE_SUFFIX, CACHE_SUFFIX)))
+    return sorted(dict.fromkeys(paths))
+
+
+def account_names(paths):
+    """
+    Names every ledger after its file name, adding a suffix when two files share a name.
+    """
+    names = {}
+    used = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        name, suffix = stem, 1
+        # A suffixed name may itself be the name of another file, e.g. x.csv, x.csv and x_2.csv
+        while name in used:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        used.add(name)
+        names[path] = name
+    return names
+
+
+def process_ledger(file_path, account, output_dir, savings_goal=500, income_threshold=0.1, reduction_percentage=0.15,
+                   base_currency='USD', rate_table=None, offline=False, stages=DEFAULT_STAGES, validate=False,
+                   metrics=False):
+    """
+    Runs load -> analyze -> report for one ledger and writes its outputs into output_dir/<account>/.
+
+    Only the requested `stages` (from LEDGER_STAGES) run; 'report' also runs the stages it needs.
+    `validate` is passed to the loader. With `metrics`, the process-wide registry of the worker is
+    reset and returned under 'metrics', so run_batch can merge the measurements of all workers.
+
+    Errors are caught and returned, so one bad ledger never stops the rest of a batch. Ledgers with a
+    'Currency' column are converted to `base_currency` while loading, like in the single-file pipeline;
+    the rate service is created in the worker, as its connections cannot be sent between processes.
+
+    Returns:
+        dict: Summary of the account with a 'status' of 'ok' or 'failed'.
+    """
+    stages = set(stages)
+    if 'report' in stages:
+        stages |= {'summary', 'recommendations', 'goal'}
+    if metrics:
+        get_metrics().reset()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    start = time.perf_counter()
+    result = {'account': account, 'file': file_path}
+    try:
+        account_dir = os.path.join(output_dir, account)
+        os.makedirs(account_dir, exist_ok=True)
+
+        converter = CurrencyConverter(ExchangeRate(rate_table=rate_table, offline=offline), base_currency)
+        loader = TransactionDataLoader(currency_converter=converter, amount_cents=True, validate=validate)
+        transactions_df = loader.load_transaction_data(file_path)
+        expense_analysis = ExpenseAnalysis(transactions_df)
+        monthly_summary_df = recommendations = monthly_reductions = rolling_ratios = None
+        if 'summary' in stages:
+            monthly_summary_df = expense_analysis.monthly_summary()
+            result.update(
+                months=len(monthly_summary_df),
+                total_income=float(monthly_summary_df['total_income'].sum()),
+                total_expenses=float(monthly_summary_df['total_expenses'].sum()),
+            )
+        if 'recommendations' in stages:
+            recommendations = expense_analysis.savings_recommendations(income_threshold, reduction_percentage)
+        if 'goal' in stages:
+            monthly_reductions = expense_analysis.calculate_monthly_savings_goal_reduction(savings_goal)
+        if 'rolling' in stages:
+            rolling_ratios = expense_analysis.rolling_expense_ratios()
+
+        if 'chart' in stages:
+            from src.visualizations.expense_visualization import ExpenseVisualization
+            ExpenseVisualization(transactions_df, expense_analysis.aggregates).plot_expenses_vs_income(
+                save_path=os.path.join(account_dir, 'monthly_expenses_vs_income.png'), show=False,
+                summary_df=monthly_summary_df)
+        if 'report' in stages:
+            from src.reports.expense_report import ReportGenerator
+            report_file = os.path.join(account_dir, 'financial_report.pdf')
+            ReportGenerator().generate_pdf_report(monthly_summary_df, recommendations, monthly_reductions,
+                                                  file_name=report_file, rolling_ratios=rolling_ratios)
+            result['report'] = report_file
+        result['status'] = 'ok'
+    except Exception as e:
+        logger.error(f"Error processing ledger {file_path}: {e}")
+        result.update(status='failed', error=f"{type(e).__name__}: {e}")
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    if metrics:
+        result['metrics'] = get_metrics().to_dict()
+    return result
+
+
+def _init_worker():
+    # Workers only ever render to files
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def run_batch(paths, output_dir, max_workers=None, **options):
+    """
+    Processes many ledgers across a process pool, keeping at most `max_workers` ledgers in flight.
+
+    Parameters:
+        paths (list): Transaction files to process.
+        output_dir (str): Directory receiving one sub-directory per account and the consolidated 'summary.csv'.
+        max_workers (int): Number of worker processes; defaults to the number of CPUs.
+        **options: Keyword arguments of process_ledger (savings_goal, stages, validate, metrics, ...)
+                   passed to every ledger; with metrics, the measurements of the workers are merged into
+                   the registry of this process.
+
+    Returns:
+        DataFrame: One row per ledger with its status, totals and processing time.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = account_names(paths)
+    max_workers = max_workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = []
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        pending = {}
+        queue = iter(paths)
+        while True:
+            # Submit lazily so thousands of ledgers never sit in the executor's queue at once
+            for path in queue:
+                future = executor.submit(process_ledger, path, names[path], output_dir, **options)
+                pending[future] = path
+                if len(pending) >= max_workers * 2:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    result = future.result()
+                    if 'metrics' in result:
+                        get_metrics().merge(result.pop('metrics'))
+                    results.append(result)
+                except Exception as e:
+                    # The worker itself died (e.g. out of memory); record it like any other failure
+                    logger.error(f"Worker failed on ledger {path}: {e}")
+                    results.append({'account': names[path], 'file': path, 'status': 'failed',
+                                    'error': f"{type(e).__name__}: {e}"})
+
+    elapsed = time.perf_counter() - start
+    summary = pd.DataFrame(results, columns=['account', 'file', 'status', 'months', 'total_income',
+                                             'total_expenses', 'report', 'seconds', 'error'])
+    summary = summary.sort_values('account').reset_index(drop=True)
+    summary.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+
+    failed = int((summary['status'] != 'ok').sum())
+    throughput = len(summary) / elapsed if elapsed > 0 else float('inf')
+    logger.info(f"Processed {len(summary)} ledgers ({failed} failed) in {elapsed:.2f}s: {throughput:.2f} files/s")
+    summary.attrs.update(elapsed=elapsed, throughput=throughput)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate reports for many transaction files in parallel.")
+    parser.add_argument('inputs', nargs='+', help="CSV files, directories or glob patterns")
+    parser.add_argument('--output-dir', default='reports_output')
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--savings-goal', type=float, default=500)
+    parser.add_argument('--income-threshold', type=float, default=0.1)
+    parser.add_argument('--reduction-percentage', type=float, default=0.15)
+    parser.add_argument('--base-currency', default='USD', help="currency amounts of multi-currency files are converted to")
+    parser.add_argument('--rate-table', default=None, help="local CSV rate table (date,from,to,rate)")
+    parser.add_argument('--offline', action='store_true', help="never call the exchange rate API")
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES),
+                        help=f"comma separated stages to run per ledger, from: {', '.join(LEDGER_STAGES)}")
+    parser.add_argument('--validate', action='store_true',
+                        help="reject rows with a bad date, amount or category and write them to <file>.rejected.csv")
+    parser.add_argument('--log-file', default='logs/app.log')
+    parser.add_argument('--metrics', default=None,
+                        help="write timings, row counts and peak memory per operation to this file "
+                             "(JSON for *.json, Prometheus text otherwise)")
+    args = parser.parse_args(argv)
+    log_dir = os.path.dirname(args.log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(process)d - %(levelname)s - %(message)s',
+        filename=args.log_file,
+        filemode='a'
+    )
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = sorted(set(stages) - set(LEDGER_STAGES))
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    paths = discover_ledgers(args.inputs)
+    summary = run_batch(paths, args.output_dir, args.workers, savings_goal=args.savings_goal,
+                        income_threshold=args.income_threshold, reduction_percentage=args.reduction_percentage,
+                        base_currency=args.base_currency, rate_table=args.rate_table, offline=args.offline,
+                        stages=stages, validate=args.validate, metrics=bool(args.metrics))
+    if args.metrics:
+        get_metrics().write(args.metrics)
+    failed = summary[summary['status'] != 'ok']
+    for _, row in failed.iterrows():
+        print(f"FAILED {row['file']}: {row['error']}")
+    print(f"{len(summary)} ledgers, {len(failed)} failed, {summary.attrs['elapsed']:.2f}s, "
+          f"{summary.attrs['throughput']:.2f} files/s. Summary: {os.path.join(args.output_dir, 'summary.csv')}")
+    return 1 if len(failed) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
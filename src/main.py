@@ -1,58 +1,226 @@
-from src.utils.expense_utils import TransactionDataLoader
-from src.utils.exchange_rate_utils import ExchangeRate
-from src.analysis.expense_analysis import ExpenseAnalysis
-from src.visualizations.expense_visualization import ExpenseVisualization
-from reports.expense_report import ReportGenerator
+import argparse
 import logging
+import os
+import sys
 
+logger = logging.getLogger(__name__)
 
-# Set up global logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='logs/app.log',
-    filemode='a'  # Append to existing log file
-)
+DEFAULT_FILE_PATH = "data/transactions_example copy.csv"
+STAGES = ['summary', 'recommendations', 'goal', 'rolling', 'chart', 'report', 'fx']
+# Stages whose results another stage needs
+STAGE_DEPENDENCIES = {'report': ['summary', 'recommendations', 'goal']}
 
-logger = logging.getLogger(__name__)
 
-if __name__ == "__main__":
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze transaction files and generate financial reports.")
+    parser.add_argument('inputs', nargs='*', default=[DEFAULT_FILE_PATH],
+                        help="CSV files, directories or glob patterns (several files are processed as a batch)")
+    parser.add_argument('--savings-goal', type=float, default=None,
+                        help="monthly savings goal; asked for interactively when omitted on a terminal, else 500")
+    parser.add_argument('--income-threshold', type=float, default=0.1)
+    parser.add_argument('--reduction-percentage', type=float, default=0.15)
+    parser.add_argument('--output-dir', default='.', help="where the chart and the PDF report are written")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"comma separated stages to run, from: {', '.join(STAGES)}")
+    parser.add_argument('--show', action='store_true', help="open the chart in a window instead of only saving it")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for batches of files")
+    parser.add_argument('--base-currency', default='USD', help="currency amounts of multi-currency files are converted to")
+    parser.add_argument('--rate-table', default=None, help="local CSV rate table (date,from,to,rate)")
+    parser.add_argument('--offline', action='store_true', help="never call the exchange rate API")
+    parser.add_argument('--fx', default='EUR:USD', help="currency pair looked up by the fx stage, as FROM:TO")
+    parser.add_argument('--validate', action='store_true',
+                        help="reject rows with a bad date, amount or category and write them to <file>.rejected.csv")
+    parser.add_argument('--log-file', default='logs/app.log')
+    parser.add_argument('--metrics', default=None,
+                        help="write timings, row counts and peak memory per operation to this file "
+                             "(JSON for *.json, Prometheus text otherwise)")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    for stage in list(stages):
+        stages.extend(STAGE_DEPENDENCIES.get(stage, []))
+    args.stages = set(stages)
+    return args
+
+
+def resolve_savings_goal(args):
+    if args.savings_goal is not None:
+        return args.savings_goal
+    if sys.stdin.isatty():
+        return float(input("Enter your monthly savings goal: "))
+    return 500.0
+
+
+def stages_need_matplotlib(stages):
+    return bool({'chart', 'report'} & set(stages))
+
+
+def build_pipeline(args):
+    """
+    Builds the stage graph of a single transaction file:
+    load -> aggregate -> {summary, recommendations, goal, rolling, chart} -> report, with fx independent of the data.
+    """
+    # Heavy dependencies are imported here and in the stages that need them, so that `--help`
+    # and invocations that skip charting, PDF output or the network stay cheap to start
+    from src.pipeline import Pipeline
+    from src.utils.exchange_rate_utils import ExchangeRate
+
+    exchange_rate_service = ExchangeRate(rate_table=args.rate_table, offline=args.offline)
+    # Asked before the stages start, so a prompt never competes with stage output
+    savings_goal = resolve_savings_goal(args) if 'goal' in args.stages else None
+    chart_file = os.path.join(args.output_dir, 'monthly_expenses_vs_income.png')
+
+    def load(_):
+        from src.utils.expense_utils import TransactionDataLoader
+        from src.utils.currency_utils import CurrencyConverter
+        # Ledgers with a 'Currency' column are converted while loading; others are loaded as is
+        transaction_data = TransactionDataLoader(
+            currency_converter=CurrencyConverter(exchange_rate_service, args.base_currency), amount_cents=True,
+            validate=args.validate
+        )
+        return transaction_data.load_transaction_data(args.inputs[0])
+
+    def aggregate(results):
+        from src.analysis.expense_analysis import ExpenseAnalysis
+        from src.analysis.ledger_view import LedgerView
+        from src.analysis.monthly_aggregates import MonthlyAggregates
+        # Derive the keys and aggregate once, and share them between the analysis, the chart and the report
+        transactions_df = results['load']
+        view = LedgerView.from_transactions(transactions_df)
+        return ExpenseAnalysis(transactions_df, MonthlyAggregates.from_view(view), view)
+
+    def summary(results):
+        expense_analysis = results['aggregate']
+        expense_analysis.sort_by_category()
+        return expense_analysis.monthly_summary()
+
+    def recommendations(results):
+        recommendations = results['aggregate'].savings_recommendations(args.income_threshold, args.reduction_percentage)
+        logger.info("\nRecommendations:")
+        for rec in recommendations:
+            logger.info(rec)
+        return recommendations
+
+    def goal(results):
+        monthly_reductions = results['aggregate'].calculate_monthly_savings_goal_reduction(savings_goal)
+        for month, message in monthly_reductions.items():
+            print(f"{month}: {message}")
+            logger.info("\nGoal Recommendation:")
+            logger.info(f"{month}: {message}")
+        return monthly_reductions
+
+    def rolling(results):
+        return results['aggregate'].rolling_expense_ratios()
+
+    def chart(results):
+        from src.visualizations.expense_visualization import ExpenseVisualization
+        expense_visualization = ExpenseVisualization(results['load'], results['aggregate'].aggregates)
+        # The chart and the report render from the same summary, so the report reuses the cached chart.
+        # Windows can only be opened from the main thread, so `--show` is handled after the stages.
+        expense_visualization.plot_expenses_vs_income(save_path=chart_file, show=False,
+                                                      summary_df=results.get('summary'))
+        return expense_visualization
+
+    def report(results):
+        from src.reports.expense_report import ReportGenerator
+        report_file = os.path.join(args.output_dir, 'financial_report.pdf')
+        ReportGenerator().generate_pdf_report(
+            results['summary'], results['recommendations'], results['goal'], file_name=report_file,
+            rolling_ratios=results.get('rolling')
+        )
+        return report_file
+
+    def fx(_):
+        from_currency, _, to_currency = args.fx.partition(':')
+        try:
+            rate = exchange_rate_service.get_exchange_rate(from_currency, to_currency or 'USD')
+            if rate is not None:
+                logger.info(f"The exchange rate from {from_currency} to {to_currency} is: {rate}")
+            else:
+                logger.info("Failed to retrieve the exchange rate.")
+            return rate
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+
+    pipeline = Pipeline()
+    pipeline.add('load', load)
+    pipeline.add('aggregate', aggregate, ['load'])
+    pipeline.add('summary', summary, ['aggregate'])
+    pipeline.add('recommendations', recommendations, ['aggregate'])
+    pipeline.add('goal', goal, ['aggregate'])
+    pipeline.add('rolling', rolling, ['aggregate'])
+    pipeline.add('chart', chart, ['load', 'aggregate'] + (['summary'] if 'summary' in args.stages else []))
+    pipeline.add('report', report,
+                 ['summary', 'recommendations', 'goal'] + (['rolling'] if 'rolling' in args.stages else []))
+    pipeline.add('fx', fx)
+    return pipeline
+
+
+def run(args):
+    """
+    Runs the requested stages on a single transaction file, independent stages concurrently.
+
+    Returns:
+        Pipeline: The executed pipeline; its `timings` hold the wall time of every stage.
+    """
+    if not args.show and stages_need_matplotlib(args.stages):
+        # Batch runs only render to files, so never pull in an interactive GUI backend
+        import matplotlib
+        matplotlib.use('Agg')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    pipeline = build_pipeline(args)
+    results = pipeline.run([stage for stage in STAGES if stage in args.stages])
+    if args.show and 'chart' in results:
+        results['chart'].plot_expenses_vs_income(show=True, summary_df=results.get('summary'))
+    return pipeline
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Set up global logging configuration
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filename=args.log_file,
+        filemode='a'  # Append to existing log file
+    )
     logger.info("Application started")
-    file_path = "data/transactions_example copy.csv"  # Replace with your actual CSV file path
-    transaction_data = TransactionDataLoader()
-    transactions_df = transaction_data.load_transaction_data(file_path)
-
-    expense_analysis = ExpenseAnalysis(transactions_df)
-    sorted_df = expense_analysis.sort_by_category()
-    monthly_summary_df = expense_analysis.monthly_summary()
-    recommendations = expense_analysis.savings_recommendations()
-    logger.info("\nRecommendations:")
-    for rec in recommendations:
-        logger.info(rec)
-
-    savings_goal = float(input("Enter your monthly savings goal: "))
-    monthly_reductions = expense_analysis.calculate_monthly_savings_goal_reduction(savings_goal)
-    for month, message in monthly_reductions.items():
-        print(f"{month}: {message}")
-        logger.info("\nGoal Recommendation:")
-        logger.info(f"{month}: {message}")
-
-    expense_visualization = ExpenseVisualization(transactions_df)
-    expense_visualization.plot_expenses_vs_income()
-    expense_report_generator = ReportGenerator()
-    expense_report_generator.generate_pdf_report(monthly_summary_df, recommendations, monthly_reductions)
-
-    # Creating instance of ExchangeRate in case of using it later. Here in CSV no currency is given so not implemented for now. 
-    exchange_rate_service = ExchangeRate()
-    from_currency = 'EUR'  
-    to_currency = 'USD'
-    try:
-        rate = exchange_rate_service.get_exchange_rate(from_currency, to_currency)
-        if rate is not None:
-            logger.info(f"The exchange rate from {from_currency} to {to_currency} is: {rate}")
-        else:
-            logger.info("Failed to retrieve the exchange rate.")
-    except Exception as e:
-        logger.error(f"An error occurred: {e}")
-    # Psss the rate in the currency to implement the method
-    # Or multiplyamount by rate in pandas dataframe to convert the currency from_currency to to_currency or similarly in savings.
+    if args.metrics:
+        # Per-operation peak memory is measured with tracemalloc, which slows allocations down a little
+        import tracemalloc
+        tracemalloc.start()
+
+    from src.batch import LEDGER_STAGES, discover_ledgers, run_batch
+    paths = discover_ledgers(args.inputs)
+    if not paths:
+        logger.error("No transaction files found.")
+        return 1
+
+    status = 0
+    if len(paths) > 1:
+        # The per-ledger stages run in the workers; fx does not depend on a ledger and is not run per file
+        options = dict(income_threshold=args.income_threshold, reduction_percentage=args.reduction_percentage,
+                       base_currency=args.base_currency, rate_table=args.rate_table, offline=args.offline,
+                       validate=args.validate, stages=[stage for stage in LEDGER_STAGES if stage in args.stages],
+                       metrics=bool(args.metrics))
+        if 'goal' in args.stages:
+            options['savings_goal'] = resolve_savings_goal(args)
+        summary = run_batch(paths, args.output_dir, args.workers, **options)
+        failed = int((summary['status'] != 'ok').sum())
+        print(f"{len(summary)} ledgers, {failed} failed, {summary.attrs['throughput']:.2f} files/s")
+        status = 1 if failed else 0
+    else:
+        args.inputs = paths
+        run(args)
+    if args.metrics:
+        from src.utils.instrumentation import get_metrics
+        get_metrics().write(args.metrics)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,62 +1,144 @@
-from fpdf import FPDF
 import logging
-import matplotlib.pyplot as plt
+import os
+import tempfile
+import numpy as np
+from src.utils.instrumentation import get_metrics
+
+
+def format_summary_rows(summary_df):
+    """
+    Formats the monthly summary table lines for the report in bulk instead of row by row.
+
+    Returns:
+        list: One "<Month>: Income: <income>, Expenses: <expenses>" string per month.
+    """
+    income = np.char.mod('%.2f', summary_df['total_income'].to_numpy(dtype='float64'))
+    expenses = np.char.mod('%.2f', summary_df['total_expenses'].to_numpy(dtype='float64'))
+    lines = summary_df['Month'].astype(str) + ': Income: ' + income + ', Expenses: ' + expenses
+    return lines.tolist()
+
+
+def format_rolling_rows(ratios_df):
+    """
+    Formats the trailing expense-to-income ratios of ExpenseAnalysis.rolling_expense_ratios in bulk.
+
+    Returns:
+        list: One "<Month>: 3 months: <ratio>%, 6 months: <ratio>%, ..." string per month ('n/a' without income).
+    """
+    lines = ratios_df['Month'].astype(str) + ':'
+    columns = [column for column in ratios_df.columns if column.startswith('ratio_')]
+    for position, column in enumerate(columns):
+        values = ratios_df[column].to_numpy(dtype='float64') * 100
+        text = np.where(np.isnan(values), 'n/a', np.char.mod('%.1f%%', np.nan_to_num(values)))
+        separator = ' ' if position == 0 else ', '
+        lines = lines + f"{separator}{column[len('ratio_'):-1]} months: " + text
+    return lines.tolist()
+
 
 class ReportGenerator:
-    def __init__(self):
-        self.pdf = FPDF()
+    def __init__(self, renderer=None):
+        """
+        Parameters:
+            renderer (ChartRenderer): Renders the report chart; the shared default renderer when omitted,
+                                      so a chart already drawn by ExpenseVisualization is reused.
+        """
+        from fpdf import FPDF, FPDF_VERSION
+        self._fpdf_class = FPDF
+        # fpdf 1.x only reads images from files; fpdf 2 also takes them in memory
+        self._image_from_file = FPDF_VERSION.startswith('1.')
+        self.renderer = renderer
         self.logger = logging.getLogger(__name__)
 
-    def generate_pdf_report(self, summary_df, recommendations, monthly_reductions, file_name="financial_report.pdf"):
-        self.pdf.set_auto_page_break(auto=True, margin=15)
-        self.pdf.add_page()
-        self.pdf.set_font("Arial", "B", 16)
-        self.pdf.cell(0, 10, "Financial Report", ln=True, align="C")
-
-        self.pdf.set_font("Arial", size=12)
-        self.pdf.ln(10)
-        for _, row in summary_df.iterrows():
-            self.pdf.cell(0, 10, f"{row['Month']}: Income: {row['total_income']:.2f}, Expenses: {row['total_expenses']:.2f}", ln=True)
-
-        self.pdf.ln(10)
-        self.pdf.set_font("Arial", "B", 14)
-        self.pdf.cell(0, 10, "Recommendations:", ln=True)
-        self.pdf.set_font("Arial", size=12)
-        for rec in recommendations:
-            self.pdf.multi_cell(0, 10, rec)
-
-        # Add Monthly Savings Goal Reductions
-        self.pdf.ln(10)
-        self.pdf.set_font("Arial", "B", 14)
-        self.pdf.cell(0, 10, "Monthly Savings Goal Reductions:", ln=True)
-        self.pdf.set_font("Arial", size=12)
-        for month, message in monthly_reductions.items():
-            self.pdf.cell(0, 10, f"{month}: {message}", ln=True)
-
-        # Generate and save the graph
-        self.generate_graph_image(summary_df)
-
-        # Add the graph to the PDF
-        self.pdf.add_page()  # Add a new page for the graph
-        self.pdf.set_font("Arial", "B", 14)
-        self.pdf.cell(0, 10, "Monthly Income vs Expenses Graph", ln=True)
-        self.pdf.ln(5)
-        self.pdf.image("monthly_expenses_vs_income.png", x=10, y=None, w=180)
-
-        self.pdf.output(file_name)
+    def _renderer(self):
+        if self.renderer is None:
+            from src.visualizations.chart_renderer import get_default_renderer
+            self.renderer = get_default_renderer()
+        return self.renderer
+
+    def _new_document(self):
+        # Every report gets its own document, so one generator can write many reports
+        pdf = self._fpdf_class()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        return pdf
+
+    def generate_pdf_report(self, summary_df, recommendations, monthly_reductions, file_name="financial_report.pdf",
+                            rolling_ratios=None):
+        """
+        Writes the PDF report. The chart is rendered in memory and embedded, and the document is local
+        to the call, so one generator can write many reports, also from several threads.
+
+        Parameters:
+            rolling_ratios (DataFrame): Optional ExpenseAnalysis.rolling_expense_ratios, added as its own section.
+        """
+        with get_metrics().timed('ReportGenerator.generate_pdf_report') as measurement:
+            measurement.rows = len(summary_df)
+            pdf = self._new_document()
+            pdf.add_page()
+            pdf.set_font("Arial", "B", 16)
+            pdf.cell(0, 10, "Financial Report", ln=True, align="C")
+
+            pdf.set_font("Arial", size=12)
+            pdf.ln(10)
+            for line in format_summary_rows(summary_df):
+                pdf.cell(0, 10, line, ln=True)
+
+            pdf.ln(10)
+            pdf.set_font("Arial", "B", 14)
+            pdf.cell(0, 10, "Recommendations:", ln=True)
+            pdf.set_font("Arial", size=12)
+            for rec in recommendations:
+                pdf.multi_cell(0, 10, rec)
+
+            # Add Monthly Savings Goal Reductions
+            pdf.ln(10)
+            pdf.set_font("Arial", "B", 14)
+            pdf.cell(0, 10, "Monthly Savings Goal Reductions:", ln=True)
+            pdf.set_font("Arial", size=12)
+            for month, message in monthly_reductions.items():
+                pdf.cell(0, 10, f"{month}: {message}", ln=True)
+
+            if rolling_ratios is not None:
+                pdf.ln(10)
+                pdf.set_font("Arial", "B", 14)
+                pdf.cell(0, 10, "Rolling Expense-to-Income Ratios:", ln=True)
+                pdf.set_font("Arial", size=12)
+                for line in format_rolling_rows(rolling_ratios):
+                    pdf.cell(0, 10, line, ln=True)
+
+            # Add the graph to the PDF
+            pdf.add_page()  # Add a new page for the graph
+            pdf.set_font("Arial", "B", 14)
+            pdf.cell(0, 10, "Monthly Income vs Expenses Graph", ln=True)
+            pdf.ln(5)
+            self._add_image(pdf, self.render_graph(summary_df), x=10, w=180)
+
+            pdf.output(file_name)
         self.logger.info(f"PDF report generated: {file_name}")
 
-    def generate_graph_image(self, summary_df):
-        plt.figure(figsize=(10, 6))
-        plt.plot(summary_df['Month'].astype(str), summary_df['total_income'], label='Income', marker='o')
-        plt.plot(summary_df['Month'].astype(str), summary_df['total_expenses'], label='Expenses', marker='o')
-        plt.title('Monthly Income vs Expenses')
-        plt.xlabel('Month')
-        plt.ylabel('Amount')
-        plt.legend()
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
-        plt.savefig("monthly_expenses_vs_income.png")
-        plt.close()
+    def _add_image(self, pdf, rgba, x, w):
+        from PIL import Image
+        # An RGB PNG is embedded by fpdf as is, while an alpha channel would be split off pixel by pixel
+        image = Image.fromarray(np.ascontiguousarray(rgba[:, :, :3]))
+        if not self._image_from_file:
+            pdf.image(image, x=x, y=None, w=w)
+            return
+        # fpdf 1.x parses the image when it is placed, so the temporary file can go right after
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image_path = os.path.join(tmp_dir, 'chart.png')
+            image.save(image_path, format='png', compress_level=1)
+            pdf.image(image_path, x=x, y=None, w=w)
+
+    def render_graph(self, summary_df):
+        """
+        Renders the monthly income vs expenses chart into memory.
+
+        Returns:
+            ndarray: The chart as a (height, width, 4) RGBA pixel array.
+        """
+        return self._renderer().render(summary_df)
+
+    def generate_graph_image(self, summary_df, image_file="monthly_expenses_vs_income.png"):
+        """
+        Writes the monthly income vs expenses chart to an image file (or a binary file object).
+        """
+        self._renderer().save(summary_df, image_file)
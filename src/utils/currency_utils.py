@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import logging
+
+
+class CurrencyConverter:
+    def __init__(self, exchange_rate, base_currency='USD'):
+        """
+        Parameters:
+            exchange_rate (ExchangeRate): Service the rates are resolved through.
+            base_currency (str): Currency all amounts are converted to.
+        """
+        self.exchange_rate = exchange_rate
+        self.base_currency = base_currency
+        self.logger = logging.getLogger(__name__)
+        # Rates fetched so far, reused while later calls (e.g. streamed chunks) stay within their coverage
+        self._rates = None
+        self._coverage = (None, None, frozenset())
+
+    def convert(self, df):
+        """
+        Converts the 'Amount' of every transaction to the base currency using the rate of its date.
+
+        The distinct (date, currency) pairs are resolved in one batch through the exchange rate service
+        and applied with an as-of join, so dates without a published rate use the last earlier one.
+
+        Parameters:
+            df (DataFrame): Transactions with 'Date', 'Amount' and an optional 'Currency' column.
+                            Rows with an empty 'Currency' are taken to be in the base currency.
+
+        Returns:
+            DataFrame: A copy with 'Amount' in the base currency and the source values kept in
+                       'OriginalAmount' and 'OriginalCurrency'. Frames without 'Currency' are returned as is.
+        """
+        if 'Currency' not in df.columns:
+            return df
+        try:
+            currency = df['Currency'].astype(object).fillna(self.base_currency)
+            foreign = (currency != self.base_currency).to_numpy()
+            rate = np.ones(len(df))
+            # Dates left as strings (e.g. chunks whose dates did not parse) are coerced, unreadable ones to NaT
+            dates = pd.to_datetime(df['Date'], errors='coerce')
+            # Foreign amounts without a valid date cannot be converted
+            undated = foreign & dates.isna().to_numpy()
+            rate[undated] = np.nan
+            foreign &= ~undated
+
+            if foreign.any():
+                # Resolve each distinct (day, currency) pair once, then gather the rates back per row
+                days = dates.to_numpy(dtype='datetime64[ns]')[foreign].astype('datetime64[D]').astype('int64')
+                currency_codes, currencies = pd.factorize(currency.to_numpy()[foreign])
+                codes, keys = pd.factorize(days * len(currencies) + currency_codes)
+                pairs = pd.DataFrame({
+                    'Date': (keys // len(currencies)).astype('datetime64[D]').astype('datetime64[ns]'),
+                    'Currency': currencies[keys % len(currencies)],
+                })
+                pair_rates = self._rates_for_pairs(pairs)
+                rate[foreign] = pair_rates[codes]
+
+            converted = df.rename(columns={'Amount': 'OriginalAmount', 'Currency': 'OriginalCurrency'})
+            converted['Amount'] = (df['Amount'].to_numpy() / rate).round(2)
+            self.logger.info(f"Converted {int(foreign.sum())} transactions to {self.base_currency}.")
+            return converted
+        except Exception as e:
+            self.logger.error(f"Error converting transaction currencies: {e}")
+            raise
+
+    def _rates_for_pairs(self, pairs):
+        """
+        Returns the base -> currency rate for every (Date, Currency) row of `pairs`, in the same order.
+        """
+        start = pairs['Date'].min()
+        end = pairs['Date'].max()
+        rates = self._rate_series(start, end, set(pairs['Currency']))
+
+        pairs = pairs.assign(position=np.arange(len(pairs)))
+        matched = pd.merge_asof(
+            pairs.sort_values('Date'), rates,
+            left_on='Date', right_on='date', left_by='Currency', right_by='currency', direction='backward'
+        )
+        missing = sorted(set(matched.loc[matched['rate'].isna(), 'Currency']))
+        if missing:
+            raise ValueError(f"No exchange rate from {self.base_currency} available for: {', '.join(missing)}")
+
+        result = np.full(len(pairs), np.nan)
+        result[matched['position'].to_numpy()] = matched['rate'].to_numpy()
+        return result
+
+    def _rate_series(self, start, end, currencies):
+        covered_start, covered_end, covered_currencies = self._coverage
+        if self._rates is not None and covered_start <= start and end <= covered_end \
+                and currencies <= covered_currencies:
+            return self._rates
+
+        if self._rates is not None:
+            start, end = min(start, covered_start), max(end, covered_end)
+            currencies = currencies | covered_currencies
+        rates = self.exchange_rate.get_rate_series(
+            self.base_currency, sorted(currencies), start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+        )
+        self._rates = rates
+        self._coverage = (start, end, frozenset(currencies))
+        return rates
@@ -1,29 +1,298 @@
-import requests
+import bisect
+import csv
+import os
+import sqlite3
+import threading
+import time
 import logging
 
+DEFAULT_BASE_URL = "https://api.frankfurter.app"
+DEFAULT_TIMEOUT = 10
+DEFAULT_TTL = 3600
+
+
 class ExchangeRate:
-    def __init__(self):
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL,
+                 store_path=None, rate_table=None, offline=False):
+        """
+        Parameters:
+            base_url (str): Root URL of a Frankfurter compatible rate API.
+            timeout (float): Timeout in seconds for every HTTP request.
+            ttl (float): Seconds a 'latest' rate is served from the in-memory cache before it is fetched again.
+            store_path (str): Optional SQLite file in which fetched rates are kept by (date, from, to).
+            rate_table (str): Optional CSV file with 'date', 'from', 'to' and 'rate' columns used as a local rate source.
+            offline (bool): Never use the network; rates come only from the caches and the rate table.
+        """
         self.logger = logging.getLogger(__name__)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.ttl = ttl
+        self.offline = offline
+        self._session = None
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._store = self._open_store(store_path) if store_path else None
+        self._table = self._load_rate_table(rate_table) if rate_table else {}
+
+    @property
+    def session(self):
+        """
+        One HTTP session per service keeps the connection to the API alive between requests.
+        requests is only imported once the network is actually used.
+        """
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
 
-    def get_exchange_rate(self, from_currency, to_currency='USD'):
+    def get_exchange_rate(self, from_currency, to_currency='USD', date=None):
         """
         Fetches the exchange rate from one currency to another.
 
         Parameters:
             from_currency (str): The currency code to convert from (e.g., 'EUR').
             to_currency (str): The currency code to convert to (default is 'USD').
+            date (str): Optional 'YYYY-MM-DD' date of the rate; the latest rate when omitted.
 
         Returns:
             float: The exchange rate if successful, otherwise None.
         """
+        return self.get_exchange_rates(from_currency, [to_currency], date).get(to_currency)
+
+    def get_exchange_rates(self, from_currency, to_currencies, date=None):
+        """
+        Fetches the exchange rates from one currency to several others, with at most one HTTP request.
+
+        Rates are looked up in the in-memory cache, the on-disk store and the local rate table first;
+        only the currencies missing from all of them are requested from the API, in a single call.
+
+        Parameters:
+            from_currency (str): The currency code to convert from (e.g., 'EUR').
+            to_currencies (list): The currency codes to convert to.
+            date (str): Optional 'YYYY-MM-DD' date of the rates; the latest rates when omitted.
+
+        Returns:
+            dict: Exchange rate per target currency; currencies that could not be resolved are left out.
+        """
+        rates = {}
+        missing = []
+        for to_currency in dict.fromkeys(to_currencies):
+            rate = self._cached_rate(date, from_currency, to_currency)
+            if rate is None:
+                missing.append(to_currency)
+            else:
+                rates[to_currency] = rate
+
+        if missing and not self.offline:
+            rates.update(self._fetch_rates(from_currency, missing, date))
+        return rates
+
+    def get_rate_series(self, from_currency, to_currencies, start_date, end_date):
+        """
+        Fetches the daily exchange rates from one currency to several others over a date range.
+
+        Currencies covered by the local rate table or by an earlier fetch kept in the on-disk store are
+        answered locally; all others are requested from the API's time series endpoint in one call.
+        The series also includes the last rate before `start_date`, so every day in the range has a rate.
+
+        Parameters:
+            from_currency (str): The currency code to convert from.
+            to_currencies (list): The currency codes to convert to.
+            start_date (str): First 'YYYY-MM-DD' date needed.
+            end_date (str): Last 'YYYY-MM-DD' date needed.
+
+        Returns:
+            DataFrame: Columns 'date' (datetime), 'currency' and 'rate', sorted by 'date'.
+        """
+        # pandas is only needed for series, single rates are answered without it
+        import pandas as pd
+
+        rows = []
+        missing = []
+        for to_currency in dict.fromkeys(to_currencies):
+            if to_currency == from_currency:
+                rows.append((start_date, to_currency, 1.0))
+                continue
+            series = self._table_series(from_currency, to_currency, start_date, end_date)
+            # A known pair without any rate up to the range is as good as unknown
+            if not series and self._store is not None:
+                series = self._read_store_series(from_currency, to_currency, start_date, end_date)
+            if not series:
+                missing.append(to_currency)
+            else:
+                rows.extend((date, to_currency, rate) for date, rate in series)
+
+        if missing and not self.offline:
+            rows.extend(self._fetch_rate_series(from_currency, missing, start_date, end_date))
+
+        series = pd.DataFrame(rows, columns=['date', 'currency', 'rate'])
+        series['date'] = pd.to_datetime(series['date'])
+        return series.sort_values('date', kind='stable').reset_index(drop=True)
+
+    def _fetch_rate_series(self, from_currency, to_currencies, start_date, end_date):
+        import pandas as pd
+
+        try:
+            # Start a week early so that ranges beginning on a weekend or holiday have a prior rate
+            fetch_start = (pd.Timestamp(start_date) - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+            url = f"{self.base_url}/{fetch_start}..{end_date}?from={from_currency}&to={','.join(to_currencies)}"
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                self.logger.error(f"Error fetching exchange rate series: HTTP {response.status_code}")
+                return []
+            rows = [
+                (date, to_currency, float(rate))
+                for date, day_rates in response.json()['rates'].items()
+                for to_currency, rate in day_rates.items() if to_currency in to_currencies
+            ]
+            for date, to_currency, rate in rows:
+                self._remember((date, from_currency, to_currency), rate)
+            if self._store is not None:
+                self._write_store_series(from_currency, to_currencies, fetch_start, end_date, rows)
+            return rows
+        except Exception as e:
+            self.logger.error(f"Error fetching exchange rate series: {e}")
+            raise
+
+    def _cached_rate(self, date, from_currency, to_currency):
+        if from_currency == to_currency:
+            return 1.0
+        key = (date or 'latest', from_currency, to_currency)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is not None and (date is not None or time.monotonic() - cached[1] < self.ttl):
+            return cached[0]
+
+        rate = None
+        if date is not None and self._store is not None:
+            rate = self._read_store(date, from_currency, to_currency)
+        if rate is None:
+            rate = self._table_rate(date, from_currency, to_currency)
+        if rate is not None:
+            self._remember(key, rate)
+        return rate
+
+    def _remember(self, key, rate):
+        with self._lock:
+            self._memory[key] = (rate, time.monotonic())
+
+    def _fetch_rates(self, from_currency, to_currencies, date=None):
         try:
-            url = f"https://api.frankfurter.app/latest?from={from_currency}&to={to_currency}"
-            response = requests.get(url)
+            url = f"{self.base_url}/{date or 'latest'}?from={from_currency}&to={','.join(to_currencies)}"
+            response = self.session.get(url, timeout=self.timeout)
             if response.status_code == 200:
-                return response.json()['rates'][to_currency]
+                payload = response.json()
+                rates = {to: float(rate) for to, rate in payload['rates'].items() if to in to_currencies}
+                for to_currency, rate in rates.items():
+                    self._remember((date or 'latest', from_currency, to_currency), rate)
+                if self._store is not None:
+                    # Kept under the requested date, so weekends and holidays are found again, and under
+                    # the business day the API answered with
+                    for rate_date in dict.fromkeys([date, payload.get('date')]):
+                        self._write_store(rate_date, from_currency, rates)
+                return rates
             else:
-                print("Error fetching exchange rate.")
-                return None
+                self.logger.error(f"Error fetching exchange rate: HTTP {response.status_code}")
+                return {}
         except Exception as e:
             self.logger.error(f"Error fetching exchange rate: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _open_store(self, store_path):
+        connection = sqlite3.connect(store_path, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rates ("
+            "date TEXT, from_currency TEXT, to_currency TEXT, rate REAL, "
+            "PRIMARY KEY (date, from_currency, to_currency))"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            "from_currency TEXT, to_currency TEXT, start_date TEXT, end_date TEXT)"
+        )
+        connection.commit()
+        return connection
+
+    def _read_store(self, date, from_currency, to_currency):
+        with self._lock:
+            row = self._store.execute(
+                "SELECT rate FROM rates WHERE date = ? AND from_currency = ? AND to_currency = ?",
+                (date, from_currency, to_currency)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write_store(self, date, from_currency, rates):
+        if date is None:
+            return
+        with self._lock:
+            self._store.executemany(
+                "INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)",
+                [(date, from_currency, to_currency, rate) for to_currency, rate in rates.items()]
+            )
+            self._store.commit()
+
+    def _read_store_series(self, from_currency, to_currency, start_date, end_date):
+        """
+        Returns the stored (date, rate) pairs of a range that an earlier series fetch fully covered, otherwise None.
+        """
+        with self._lock:
+            covered = self._store.execute(
+                "SELECT MIN(start_date) FROM coverage "
+                "WHERE from_currency = ? AND to_currency = ? AND start_date <= ? AND end_date >= ?",
+                (from_currency, to_currency, start_date, end_date)
+            ).fetchone()[0]
+            if covered is None:
+                return None
+            return self._store.execute(
+                "SELECT date, rate FROM rates WHERE from_currency = ? AND to_currency = ? "
+                "AND date >= ? AND date <= ? ORDER BY date",
+                (from_currency, to_currency, covered, end_date)
+            ).fetchall()
+
+    def _write_store_series(self, from_currency, to_currencies, start_date, end_date, rows):
+        with self._lock:
+            self._store.executemany(
+                "INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)",
+                [(date, from_currency, to_currency, rate) for date, to_currency, rate in rows]
+            )
+            self._store.executemany(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                [(from_currency, to_currency, start_date, end_date) for to_currency in to_currencies]
+            )
+            self._store.commit()
+
+    def _load_rate_table(self, rate_table):
+        """
+        Loads a local rate table into {(from, to): (sorted dates, rates)}, adding the inverse pairs.
+        """
+        table = {}
+        with open(os.fspath(rate_table), newline='') as f:
+            for row in csv.DictReader(f):
+                rate = float(row['rate'])
+                table.setdefault((row['from'], row['to']), []).append((row['date'], rate))
+                table.setdefault((row['to'], row['from']), []).append((row['date'], 1 / rate))
+        for pair, entries in table.items():
+            entries.sort()
+            table[pair] = ([entry_date for entry_date, _ in entries], [rate for _, rate in entries])
+        self.logger.info(f"Loaded offline rate table {rate_table} ({len(table)} currency pairs).")
+        return table
+
+    def _table_rate(self, date, from_currency, to_currency):
+        """
+        Returns the rate of the local table on `date`, or on the closest earlier date (weekends and
+        holidays have no rates). Without a date the most recent rate is used.
+        """
+        entry = self._table.get((from_currency, to_currency))
+        if entry is None:
+            return None
+        dates, rates = entry
+        position = len(dates) if date is None else bisect.bisect_right(dates, date)
+        return rates[position - 1] if position else None
+
+    def _table_series(self, from_currency, to_currency, start_date, end_date):
+        entry = self._table.get((from_currency, to_currency))
+        if entry is None:
+            return None
+        dates, rates = entry
+        first = max(bisect.bisect_right(dates, start_date) - 1, 0)
+        last = bisect.bisect_right(dates, end_date)
+        return list(zip(dates[first:last], rates[first:last]))
@@ -1,15 +1,353 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 import logging
+from src.analysis.monthly_aggregates import MonthlyAggregates
+from src.utils.instrumentation import instrumented
+from src.utils.money import CENTS_COLUMN, to_cents
+
+# Compact dtypes used when streaming large files; amounts are turned into integer cents per chunk
+STREAMING_DTYPES = {'Category': 'category', 'Amount': 'float64', 'Currency': 'category'}
+DEFAULT_CHUNKSIZE = 500_000
+
+# Date formats tried, in order, when detecting the format of a file; month-first before day-first like pandas
+DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y',
+                '%d.%m.%Y', '%d-%m-%Y', '%Y%m%d']
+DATE_SAMPLE_SIZE = 1000
+# Rejected rows of a validated file are written next to it
+QUARANTINE_SUFFIX = '.rejected.csv'
+
+# Columnar cache written next to the source file
+CACHE_SUFFIX = '.cache.feather'
+CACHE_METADATA_KEY = b'transaction_cache'
+CACHE_VERSION = 2
+# Bytes hashed at each end of the already aggregated part of a file to recognise a replaced file
+FINGERPRINT_BYTES = 1 << 16
+
+
+def _import_pyarrow():
+    """
+    Returns the pyarrow module, or None when the optional dependency is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.feather
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _file_sha256(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prefix_fingerprint(file_path, offset, block_size=FINGERPRINT_BYTES):
+    """
+    Hashes the first and the last `block_size` bytes before `offset`, so a file that was replaced
+    rather than appended to is recognised without reading all of it.
+    """
+    digest = hashlib.sha256(str(offset).encode())
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(min(offset, block_size)))
+        if offset > block_size:
+            f.seek(max(block_size, offset - block_size))
+            digest.update(f.read(offset - f.tell()))
+    return digest.hexdigest()
+
+
+def detect_date_format(values, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Detects the date format of a column from a sample of its non-empty values.
+
+    Parameters:
+        values (Series): Raw date strings.
+        sample_size (int): Number of values tried against every candidate format.
+
+    Returns:
+        str: The format of DATE_FORMATS that parses the most sampled values, or None when none parses any.
+    """
+    sample = values.dropna()
+    if len(sample) > sample_size:
+        # Spread over the whole column, so a bad first block does not decide the format
+        sample = sample.iloc[np.linspace(0, len(sample) - 1, sample_size).astype(int)]
+    sample = sample.astype(str)
+    best, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = int(pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum())
+        if count > best_count:
+            best, best_count = date_format, count
+            if count == len(sample):
+                break
+    return best
+
+
+def parse_dates(values, date_format='auto'):
+    """
+    Parses a date column with one fixed format, converting every distinct value only once.
+
+    Ledgers repeat the same few hundred dates over millions of rows, and pandas only caches repeated
+    values when the head of the column looks repetitive, so its per-value parsing of non-ISO formats
+    dominates large loads. The distinct values are parsed here and broadcast back by their codes.
+
+    Parameters:
+        values (Series): Raw dates.
+        date_format (str): strftime format, 'auto' to detect it with detect_date_format, or None for
+                           pandas' own inference.
+
+    Returns:
+        Series: datetime64 values, NaT where a value does not match the format. The format used
+                (None for pandas' inference) is kept in `attrs['date_format']`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    if date_format == 'auto':
+        date_format = detect_date_format(uniques)
+    if date_format is None:
+        parsed = pd.to_datetime(uniques, errors='coerce')
+    else:
+        parsed = pd.to_datetime(uniques, format=date_format, errors='coerce')
+    # Code -1 (missing value) becomes NaT
+    dates = pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index, name=values.name)
+    dates.attrs['date_format'] = date_format
+    return dates
+
+
+def record_lines(file_path, records, block_size=1 << 24):
+    """
+    Finds the physical line on which every data record of a CSV file starts, counting the header as
+    line 1 and skipping blank lines like pandas does.
+
+    Parameters:
+        file_path (str): The CSV file.
+        records (int): Number of data records pandas read from it.
+        block_size (int): Bytes scanned at once, so large files are never held in memory.
+
+    Returns:
+        ndarray: The line number of every record, or None when the file cannot be matched to the records.
+    """
+    newline, carriage_return = ord('\n'), ord('\r')
+    found = []
+    lines_seen = 0
+    offset = 0
+    line_start = 0
+    last_byte = None
+    with open(file_path, 'rb') as f:
+        # Without quoted line breaks, every non-blank line after the header is one record
+        for block in iter(lambda: f.read(block_size), b''):
+            data = np.frombuffer(block, dtype=np.uint8)
+            ends = np.flatnonzero(data == newline)
+            starts = np.concatenate([[line_start - offset], ends[:-1] + 1])
+            # The byte before a newline at the start of the block ends the previous block
+            before = data[np.maximum(ends - 1, 0)]
+            if len(ends) and ends[0] == 0 and last_byte is not None:
+                before[0] = last_byte
+            blank = (ends == starts) | ((ends - starts == 1) & (before == carriage_return))
+            found.append(np.flatnonzero(~blank) + lines_seen + 1)
+            lines_seen += len(ends)
+            if len(ends):
+                line_start = offset + ends[-1] + 1
+            offset += len(data)
+            last_byte = data[-1]
+    # A last line without a newline
+    if offset > line_start and not (offset - line_start == 1 and last_byte == carriage_return):
+        found.append(np.array([lines_seen + 1]))
+    lines = np.concatenate(found)[1:] if found else np.array([], dtype='int64')
+    if len(lines) == records:
+        return lines
+
+    # Records spanning several lines: let the csv module follow the quoting
+    lines = []
+    with open(file_path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        previous = 0
+        for row in reader:
+            if row:
+                lines.append(previous + 1)
+            previous = reader.line_num
+    lines = np.array(lines[1:], dtype='int64')
+    return lines if len(lines) == records else None
+
+
+def validate_transactions(df, dates):
+    """
+    Checks every row of a raw transaction frame in one vectorized pass.
+
+    Parameters:
+        df (DataFrame): Transactions as read from the CSV file.
+        dates (Series): The parsed 'Date' column.
+
+    Returns:
+        tuple: (Series of numeric amounts, Series with the reason every row is rejected, None for valid rows).
+    """
+    amounts = pd.to_numeric(df['Amount'], errors='coerce')
+    # The first failing check of a row is its reason
+    checks = {
+        'missing_date': df['Date'].isna().to_numpy(),
+        'invalid_date': dates.isna().to_numpy(),
+        'missing_amount': df['Amount'].isna().to_numpy(),
+        'invalid_amount': ~np.isfinite(amounts.to_numpy(dtype='float64', na_value=np.nan)),
+    }
+    if 'Category' in df.columns:
+        # Blank labels are found among the distinct categories; missing ones (code -1) take the trailing True
+        codes, labels = pd.factorize(df['Category'])
+        blank = np.append(pd.Series(labels, dtype=object).astype(str).str.strip().to_numpy() == '', True)
+        checks['missing_category'] = blank[codes]
+    reasons = np.select(list(checks.values()), list(checks.keys()), default='')
+    return amounts, pd.Series(np.where(reasons == '', None, reasons), index=df.index, name='reason')
 
 
 class TransactionDataLoader:
-    def __init__(self):
+    def __init__(self, use_cache=True, currency_converter=None, amount_cents=False, date_format='auto', validate=False):
+        """
+        Parameters:
+            use_cache (bool): Keep a typed Feather copy of each loaded CSV next to it and load from it
+                              while the CSV is unchanged. Needs the optional pyarrow dependency.
+            currency_converter (CurrencyConverter): Optional converter applied to files with a 'Currency'
+                              column, so all loaded amounts are in its base currency.
+            amount_cents (bool): Replace the 'Amount' column of loaded frames with an integer 'AmountCents'
+                              column (32-bit when the values fit), after any currency conversion.
+            date_format (str): Format of the 'Date' column, 'auto' to detect it from a sample, or None for
+                              pandas' slower per-value inference.
+            validate (bool): Check dates, amounts and categories while loading; rejected rows are left out,
+                              counted in `df.attrs['rejected_rows']` and written with their reason and the
+                              line they start on (the header being line 1) to '<file>.rejected.csv'.
+                              Validated loads bypass the cache.
+        """
         self.logger = logging.getLogger(__name__)
+        self.use_cache = use_cache
+        self.currency_converter = currency_converter
+        self.amount_cents = amount_cents
+        self.date_format = date_format
+        self.validate = validate
+        # Date format detected per file, so appended rows and later chunks are read like the rest of the file
+        self._date_formats = {}
+
+    def _prepare(self, df, amount_cents):
+        if self.currency_converter is not None:
+            df = self.currency_converter.convert(df)
+        if amount_cents:
+            missing = df['Amount'].isna()
+            if missing.any():
+                self.logger.warning(f"{int(missing.sum())} transactions have no amount and are left out of the analysis.")
+                df = df[~missing.to_numpy()]
+            df = df.assign(**{CENTS_COLUMN: to_cents(df['Amount'])}).drop(columns='Amount')
+        return df
+
+    @staticmethod
+    def cache_path(file_path):
+        return f"{file_path}{CACHE_SUFFIX}"
+
+    @staticmethod
+    def quarantine_path(file_path):
+        return f"{file_path}{QUARANTINE_SUFFIX}"
+
+    def _parse_dates(self, file_path, values, reuse=False):
+        """
+        Parses a date column of `file_path`; with `reuse`, the format detected earlier for the file is used,
+        unless the values read better in another format.
+        """
+        key = os.path.abspath(file_path)
+        date_format = self.date_format
+        if reuse and date_format == 'auto':
+            date_format = self._date_formats.get(key, date_format)
+        dates = parse_dates(values, date_format)
+        if date_format != self.date_format and (dates.isna() & values.notna()).any():
+            # The earlier values may have been ambiguous (e.g. only days up to 12): detect the format again
+            redetected = parse_dates(values, 'auto')
+            if redetected.notna().sum() > dates.notna().sum():
+                self.logger.warning(f"Dates of {file_path} do not match {date_format}; "
+                                    f"reading them as {redetected.attrs['date_format']}.")
+                dates = redetected
+        if dates.attrs.get('date_format'):
+            self._date_formats[key] = dates.attrs['date_format']
+        return dates
+
+    def _parse(self, df, file_path, reuse=False):
+        dates = self._parse_dates(file_path, df['Date'], reuse)
+        unparsed = int((dates.isna() & df['Date'].notna()).sum())
+        if unparsed:
+            self.logger.warning(f"{unparsed} transactions have an unreadable date and are left out of the analysis.")
+        df['Date'] = dates
+        return df
+
+    def _quarantine(self, file_path, rows, reasons, records):
+        """
+        Writes rejected rows with their reason and the line they start on to the quarantine file of
+        `file_path`, or removes a stale quarantine file when nothing was rejected.
 
+        Parameters:
+            file_path (str): The CSV file the rows were read from.
+            rows (DataFrame): The rejected rows as read, indexed by their record number.
+            reasons (Series): The reason of every rejected row, with the same index.
+            records (int): Number of data records in the file.
+
+        Returns:
+            dict: Number of rejected rows per reason.
+        """
+        quarantine = self.quarantine_path(file_path)
+        counts = reasons.value_counts().to_dict()
+        if len(rows):
+            lines = record_lines(file_path, records)
+            if lines is None:
+                self.logger.warning(f"Could not match the lines of {file_path}; rejected rows are numbered by record.")
+                lines = np.arange(records) + 2
+            rows.assign(line=lines[rows.index.to_numpy()], reason=reasons).to_csv(quarantine, index=False)
+            self.logger.warning(f"Rejected {len(rows)} of {records} transactions "
+                                f"({', '.join(f'{reason}: {count}' for reason, count in counts.items())}); "
+                                f"see {quarantine}.")
+        elif os.path.exists(quarantine):
+            os.remove(quarantine)
+        return counts
+
+    def _read_validated(self, file_path):
+        raw = pd.read_csv(file_path, dtype={'Date': str})
+        dates = self._parse_dates(file_path, raw['Date'])
+        amounts, reasons = validate_transactions(raw, dates)
+        rejected = reasons.notna().to_numpy()
+        counts = self._quarantine(file_path, raw[rejected], reasons[rejected], len(raw))
+
+        df = raw[~rejected].assign(Date=dates[~rejected], Amount=amounts[~rejected]).reset_index(drop=True)
+        df.attrs['rejected_rows'] = counts
+        return df
+
+    def _detect_stream_date_format(self, file_path, first_dates, chunksize):
+        """
+        Detects the date format of a streamed file from the dates of its first chunk. When they also read
+        in another format (e.g. only days up to 12), the distinct dates of the whole file decide instead,
+        reading only its 'Date' column.
+        """
+        distinct = pd.Series(first_dates.dropna().unique(), dtype=object).astype(str)
+        counts = {date_format: int(pd.to_datetime(distinct, format=date_format, errors='coerce').notna().sum())
+                  for date_format in DATE_FORMATS}
+        best = max(counts.values())
+        if best == 0 or sum(count == best for count in counts.values()) == 1:
+            return detect_date_format(distinct)
+        self.logger.info(f"The first dates of {file_path} fit several formats; reading all its dates to decide.")
+        distinct = {}
+        with pd.read_csv(file_path, usecols=['Date'], dtype={'Date': str}, chunksize=chunksize) as reader:
+            for chunk in reader:
+                distinct.update(dict.fromkeys(chunk['Date'].dropna().unique()))
+        return detect_date_format(pd.Series(list(distinct), dtype=object))
+
+    @instrumented()
     def load_transaction_data(self, file_path):
         """
         Loads transaction data from a CSV file and converts the 'Date' column to datetime format.
 
+        When caching is enabled, the parsed data is stored in a columnar cache on first load and
+        memory-mapped on later loads until the CSV (size, mtime and content hash) or the date format changes.
+
         Parameters:
             file_path (str): The path to the CSV file containing transaction data.
 
@@ -18,10 +356,231 @@ class TransactionDataLoader:
                         with the 'Date' column converted to datetime format.
         """
         try:
-            df = pd.read_csv(file_path)
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+            if self.validate:
+                df = self._read_validated(file_path)
+                cache = False
+            else:
+                cache = self.use_cache and os.path.isfile(file_path) and _import_pyarrow() is not None
+                df = self._read_cache(file_path) if cache else None
+            if df is None:
+                df = self._parse(pd.read_csv(file_path), file_path)
+                if cache:
+                    self._write_cache(file_path, df)
+            df = self._prepare(df, self.amount_cents)
             self.logger.info("Transaction data loaded successfully.")
             return df
         except Exception as e:
             self.logger.error(f"Error loading transaction data: {e}")
             raise
+
+    def iter_transaction_chunks(self, file_path, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Reads transaction data from a CSV file in bounded chunks with compact dtypes.
+
+        Dates are parsed chunk by chunk with one format, detected on the first chunk or, when its dates
+        are ambiguous (e.g. only days up to 12), on the distinct dates of the whole file. 'Category' is read
+        as a categorical and 'Amount' is replaced by integer 'AmountCents', so peak memory depends on
+        `chunksize` rather than on the size of the file.
+
+        Rows without a readable date are left out of the chunks; once the file is read to the end they
+        are written with their reason and line to '<file>.rejected.csv'.
+
+        Parameters:
+            file_path (str): The path to the CSV file containing transaction data.
+            chunksize (int): The maximum number of rows held in memory at once.
+
+        Yields:
+            DataFrame: Consecutive chunks of the transaction data.
+        """
+        try:
+            rejected_rows, rejected_reasons = [], []
+            records = 0
+            with pd.read_csv(file_path, dtype=STREAMING_DTYPES, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    if records == 0 and self.date_format == 'auto':
+                        detected = self._detect_stream_date_format(file_path, chunk['Date'], chunksize)
+                        if detected is not None:
+                            self._date_formats[os.path.abspath(file_path)] = detected
+                    records += len(chunk)
+                    dates = self._parse_dates(file_path, chunk['Date'], reuse=True)
+                    rejected = dates.isna().to_numpy()
+                    if rejected.any():
+                        rejected_rows.append(chunk[rejected])
+                        rejected_reasons.append(pd.Series(
+                            np.where(chunk['Date'].isna().to_numpy()[rejected], 'missing_date', 'invalid_date'),
+                            index=chunk.index[rejected], name='reason'))
+                        chunk = chunk[~rejected]
+                    if len(chunk):
+                        yield self._prepare(chunk.assign(Date=dates[~rejected]), amount_cents=True)
+            if rejected_rows:
+                self._quarantine(file_path, pd.concat(rejected_rows), pd.concat(rejected_reasons), records)
+            elif os.path.exists(self.quarantine_path(file_path)):
+                os.remove(self.quarantine_path(file_path))
+        except Exception as e:
+            self.logger.error(f"Error streaming transaction data: {e}")
+            raise
+
+    @instrumented(rows=lambda aggregates: aggregates.rows)
+    def load_transaction_aggregates(self, file_path, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Streams a CSV file chunk by chunk and folds every chunk into running monthly/category aggregates.
+
+        Parameters:
+            file_path (str): The path to the CSV file containing transaction data.
+            chunksize (int): The maximum number of rows held in memory at once.
+
+        Returns:
+            MonthlyAggregates: The aggregate cube of the whole file, usable as ExpenseAnalysis(None, aggregates).
+        """
+        aggregates = None
+        rows = 0
+        for chunk in self.iter_transaction_chunks(file_path, chunksize):
+            chunk_aggregates = MonthlyAggregates.from_transactions(chunk)
+            aggregates = chunk_aggregates if aggregates is None else aggregates.combine(chunk_aggregates)
+            rows += len(chunk)
+        if aggregates is None:
+            aggregates = MonthlyAggregates.empty()
+        self.logger.info(f"Transaction data streamed successfully ({rows} rows).")
+        return aggregates
+
+    @instrumented()
+    def load_appended_transactions(self, file_path, offset=0):
+        """
+        Loads only the transactions appended to a CSV file after byte `offset`.
+
+        Only complete lines are read: a last line without its newline may still be being written, so it
+        is left for the next call. Dates are read in the format detected when the file was first loaded,
+        as a small batch alone can be ambiguous (e.g. only days up to 12).
+
+        Parameters:
+            file_path (str): The path to the CSV file containing transaction data.
+            offset (int): Byte offset up to which the file was already read (0 reads the whole file).
+
+        Returns:
+            tuple: (DataFrame of the new transactions, byte offset to pass on the next call).
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.readline()
+                start = max(offset, f.tell())
+                f.seek(start)
+                data = f.read()
+            data = data[:data.rfind(b'\n') + 1]
+            new_offset = start + len(data)
+            if not header.endswith(b'\n'):
+                header += b'\n'
+            df = self._parse(pd.read_csv(io.BytesIO(header + data)), file_path, reuse=offset > 0)
+            df = self._prepare(df, self.amount_cents)
+            self.logger.info(f"Loaded {len(df)} appended transactions from {file_path}.")
+            return df, new_offset
+        except Exception as e:
+            self.logger.error(f"Error loading appended transaction data: {e}")
+            raise
+
+    def update_aggregates(self, file_path, state_path):
+        """
+        Brings a persisted aggregate state up to date with the rows appended to a CSV file since the last update.
+
+        The state remembers the source file, how many bytes of it were aggregated and a fingerprint of
+        those bytes, so a daily refresh only parses the new rows. If the file was replaced or truncated,
+        the state is rebuilt from scratch.
+
+        Parameters:
+            file_path (str): The path to the append-only CSV file containing transaction data.
+            state_path (str): The JSON aggregate state; created on the first call.
+
+        Returns:
+            MonthlyAggregates: The up to date aggregates, usable as ExpenseAnalysis(None, aggregates).
+        """
+        aggregates = MonthlyAggregates.load(state_path) if os.path.exists(state_path) else None
+        size = os.path.getsize(file_path)
+        offset = 0
+        if aggregates is not None:
+            source = aggregates.metadata.get('source')
+            offset = aggregates.metadata.get('offset', 0)
+            if source != os.path.abspath(file_path) or offset > size or \
+                    aggregates.metadata.get('fingerprint') != _prefix_fingerprint(file_path, offset):
+                self.logger.warning(f"Aggregate state {state_path} does not match {file_path}; rebuilding it.")
+                aggregates, offset = None, 0
+            elif aggregates.metadata.get('date_format'):
+                self._date_formats[os.path.abspath(file_path)] = aggregates.metadata['date_format']
+
+        new_rows, offset = self.load_appended_transactions(file_path, offset)
+        if aggregates is None:
+            aggregates = MonthlyAggregates.from_transactions(new_rows)
+        else:
+            aggregates = aggregates.add_transactions(new_rows)
+        aggregates.metadata.update(source=os.path.abspath(file_path), offset=offset,
+                                   fingerprint=_prefix_fingerprint(file_path, offset),
+                                   date_format=self._date_formats.get(os.path.abspath(file_path)))
+        aggregates.save(state_path)
+        return aggregates
+
+    def _read_cache(self, file_path):
+        """
+        Returns the cached DataFrame for `file_path`, or None when there is no valid cache.
+        """
+        pa = _import_pyarrow()
+        cache_path = self.cache_path(file_path)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(cache_path))
+            metadata = json.loads(reader.schema.metadata[CACHE_METADATA_KEY])
+            stat = os.stat(file_path)
+            if metadata['version'] != CACHE_VERSION or metadata['size'] != stat.st_size:
+                return None
+            # Dates parsed in another format than the one asked for are no use, even from the same file
+            if self.date_format not in (metadata['date_format'], metadata['parsed_date_format']):
+                return None
+            refresh = metadata['mtime_ns'] != stat.st_mtime_ns
+            if refresh and metadata['sha256'] != _file_sha256(file_path):
+                return None
+            df = reader.read_all().to_pandas()
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable transaction cache {cache_path}: {e}")
+            return None
+
+        if metadata['parsed_date_format']:
+            self._date_formats[os.path.abspath(file_path)] = metadata['parsed_date_format']
+        if refresh:
+            # Same content with a new mtime (e.g. a fresh copy): keep the cache, update its fingerprint
+            self._write_cache(file_path, df)
+        self.logger.debug(f"Transaction data read from cache {cache_path}.")
+        return df
+
+    def _write_cache(self, file_path, df):
+        pa = _import_pyarrow()
+        cache_path = self.cache_path(file_path)
+        try:
+            stat = os.stat(file_path)
+            # The format asked for and the one the dates were parsed with ('auto' resolves to a format)
+            parsed_date_format = None
+            if self.date_format is not None:
+                parsed_date_format = self._date_formats.get(os.path.abspath(file_path))
+            metadata = {
+                'version': CACHE_VERSION,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': _file_sha256(file_path),
+                'date_format': self.date_format,
+                'parsed_date_format': parsed_date_format,
+            }
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            schema_metadata = dict(table.schema.metadata or {})
+            schema_metadata[CACHE_METADATA_KEY] = json.dumps(metadata).encode()
+            table = table.replace_schema_metadata(schema_metadata)
+
+            # Write to a temporary file and rename so concurrent readers never see a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.tmp')
+            os.close(fd)
+            try:
+                pa.feather.write_feather(table, tmp_path, compression='uncompressed')
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, cache_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self.logger.debug(f"Transaction cache written to {cache_path}.")
+        except Exception as e:
+            self.logger.warning(f"Could not write transaction cache {cache_path}: {e}")
@@ -0,0 +1,224 @@
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+# Whether an instrumented call is running on the current thread
+_running = threading.local()
+
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics registry used by the instrumented loader, analysis, renderer and report.
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = Metrics()
+        return _default_metrics
+
+
+def instrumented(name=None, rows=None):
+    """
+    Decorator measuring every call of a function in the process-wide registry.
+
+    Calls made from inside another instrumented call on the same thread (e.g. a public method used
+    by another one) are not measured separately, so their time and rows are not counted twice.
+
+    Parameters:
+        name (str): Name of the measurement; the function's qualified name when omitted.
+        rows (callable): Returns the row count from the function's result; its length by default.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_running, 'active', False):
+                return func(*args, **kwargs)
+            _running.active = True
+            try:
+                with get_metrics().timed(label) as measurement:
+                    result = func(*args, **kwargs)
+                    measurement.rows = (rows or _row_count)(result)
+                return result
+            finally:
+                _running.active = False
+        return wrapper
+    return decorator
+
+
+def _empty_stats():
+    return {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'peak_bytes': None}
+
+
+def _row_count(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+class Measurement:
+    """
+    Handle yielded by Metrics.timed, so the measured block can report the rows it handled.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        # Traced memory when the block started and the highest traced memory seen while it runs
+        self.start_bytes = None
+        self.peak_bytes = 0
+
+
+class Metrics:
+    """
+    Thread-safe registry of timings, row counts and peak memory per instrumented operation.
+
+    Measuring costs two clock reads, so it stays on in production; the collected numbers are
+    exported as JSON or in the Prometheus text format. Memory is measured only while tracemalloc
+    is tracing (`python -X tracemalloc`, or the --metrics option of the CLI): the peak of a call is
+    the most memory allocated above the level at its start. tracemalloc traces the whole process,
+    so calls running at the same time on other threads add to each other's peaks.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats = {}
+        # Measurements in progress while tracing; resetting the traced peak for one must not lose it for the others
+        self._memory_lock = threading.Lock()
+        self._open = []
+
+    @contextmanager
+    def timed(self, name):
+        """
+        Measures the wall time (and the peak traced memory) of a block; set `.rows` on the yielded
+        Measurement to record a row count.
+        """
+        measurement = Measurement(name)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self._start_memory(measurement)
+        start = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            seconds = time.perf_counter() - start
+            peak = self._stop_memory(measurement) if tracing else None
+            self.record(name, seconds, measurement.rows, peak)
+
+    def _start_memory(self, measurement):
+        with self._memory_lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            for running in self._open:
+                running.peak_bytes = max(running.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            measurement.start_bytes = tracemalloc.get_traced_memory()[0]
+            measurement.peak_bytes = measurement.start_bytes
+            self._open.append(measurement)
+
+    def _stop_memory(self, measurement):
+        with self._memory_lock:
+            self._open.remove(measurement)
+            if not tracemalloc.is_tracing():
+                return None
+            peak = max(measurement.peak_bytes, tracemalloc.get_traced_memory()[1])
+            return peak - measurement.start_bytes
+
+    def record(self, name, seconds, rows=None, peak_bytes=None):
+        """
+        Adds one measurement of `name`.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(name, _empty_stats())
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            if rows is not None:
+                stats['rows'] += rows
+            if peak_bytes is not None:
+                stats['peak_bytes'] = max(stats['peak_bytes'] or 0, peak_bytes)
+        self.logger.debug(f"{name}: {seconds:.4f}s, rows={rows}, peak_bytes={peak_bytes}")
+
+    def merge(self, stats):
+        """
+        Adds the measurements of another registry, as returned by its to_dict (e.g. from a worker process).
+        """
+        with self._lock:
+            for name, other in stats.items():
+                current = self._stats.setdefault(name, _empty_stats())
+                current['calls'] += other['calls']
+                current['seconds'] += other['seconds']
+                current['max_seconds'] = max(current['max_seconds'], other['max_seconds'])
+                current['rows'] += other['rows']
+                if other['peak_bytes'] is not None:
+                    current['peak_bytes'] = max(current['peak_bytes'] or 0, other['peak_bytes'])
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: {name: {'calls', 'seconds', 'max_seconds', 'rows', 'peak_bytes'}} for every measured operation;
+                  'peak_bytes' is the largest peak of a single call, None when memory was not traced.
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in sorted(self._stats.items())}
+
+    def to_prometheus(self, prefix='sympera'):
+        """
+        Returns:
+            str: The measurements in the Prometheus text exposition format.
+        """
+        stats = self.to_dict()
+        metrics = [
+            ('operation_seconds_total', 'counter', 'Wall time spent in the operation.', 'seconds'),
+            ('operation_calls_total', 'counter', 'Number of calls of the operation.', 'calls'),
+            ('operation_max_seconds', 'gauge', 'Slowest single call of the operation.', 'max_seconds'),
+            ('operation_rows_total', 'counter', 'Rows handled by the operation.', 'rows'),
+            ('operation_peak_bytes', 'gauge', 'Most memory allocated by a single call of the operation.',
+             'peak_bytes'),
+        ]
+        lines = []
+        for metric, kind, help_text, key in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, values in stats.items():
+                if values[key] is not None:
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{prefix}_{metric}{{operation="{label}"}} {values[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Writes the measurements atomically to `path`: JSON for '.json' files, Prometheus text otherwise.
+        """
+        if path.endswith('.json'):
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            # mkstemp creates the file readable by its owner only
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self.logger.info(f"Metrics written to {path}")
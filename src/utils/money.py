@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+CENTS_COLUMN = 'AmountCents'
+INT32_LIMIT = np.iinfo(np.int32).max
+# Largest amount in currency units whose cents fit in 64 bits
+AMOUNT_LIMIT = np.iinfo(np.int64).max // 100
+
+
+def to_cents(amount):
+    """
+    Converts currency amounts to fixed-point integer cents.
+
+    Amounts with more than two decimals are rounded half to even. The result uses 32 bits per row
+    when every value fits, 64 bits otherwise.
+
+    Parameters:
+        amount (Series): Amounts in currency units.
+
+    Returns:
+        Series: The amounts in integer cents, with the same index.
+
+    Raises:
+        ValueError: When an amount is missing or not finite, or its cents do not fit in 64 bits.
+    """
+    values = amount.to_numpy()
+    if not np.issubdtype(values.dtype, np.integer):
+        values = values.astype('float64')
+        invalid = ~np.isfinite(values)
+        if invalid.any():
+            raise ValueError(f"{int(invalid.sum())} amounts are missing or not finite and have no value in cents.")
+    if len(values) and (values.max() > AMOUNT_LIMIT or values.min() < -AMOUNT_LIMIT):
+        raise ValueError(f"Amounts beyond +/-{AMOUNT_LIMIT} do not fit in 64-bit cents.")
+    if np.issubdtype(values.dtype, np.integer):
+        cents = values.astype('int64') * 100
+    else:
+        cents = np.rint(values * 100).astype('int64')
+    if len(cents) and np.abs(cents).max() <= INT32_LIMIT:
+        cents = cents.astype('int32')
+    return pd.Series(cents, index=amount.index, name=CENTS_COLUMN)
+
+
+def transaction_cents(df):
+    """
+    Returns the integer cents of a transaction frame, from 'AmountCents' when it has one, else from 'Amount'.
+    """
+    if CENTS_COLUMN in df.columns:
+        return df[CENTS_COLUMN]
+    return to_cents(df['Amount'])
+
+
+def from_cents(cents):
+    """
+    Converts integer cents back to currency units (float64) for output.
+    """
+    return np.asarray(cents, dtype='int64') / 100
+
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src.utils.instrumentation import get_metrics
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+
+def get_default_renderer():
+    """
+    Returns the process-wide ChartRenderer, so charts drawn by the visualization and the report share one cache.
+    """
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            _default_renderer = ChartRenderer()
+        return _default_renderer
+
+
+class ChartRenderer:
+    """
+    Renders the monthly income vs expenses chart from a precomputed monthly summary.
+
+    One matplotlib figure is created per renderer and reused for every chart (only the line data,
+    ticks and limits change), and rendered images are cached by a hash of the input data and styling.
+    """
+
+    def __init__(self, size=(10, 6), dpi=100, title='Monthly Income vs Expenses', xlabel='Month', ylabel='Amount',
+                 cache_size=16):
+        self.style = {'size': tuple(size), 'dpi': dpi, 'title': title, 'xlabel': xlabel, 'ylabel': ylabel}
+        self.cache_size = cache_size
+        self.logger = logging.getLogger(__name__)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._figure = None
+
+    def cache_key(self, summary_df):
+        """
+        Returns:
+            str: Hash of the plotted columns and the styling; equal keys render identical images.
+        """
+        data = pd.DataFrame({
+            'Month': summary_df['Month'].astype(str),
+            'total_income': summary_df['total_income'].astype('float64'),
+            'total_expenses': summary_df['total_expenses'].astype('float64'),
+        })
+        digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+        digest.update(repr(sorted(self.style.items())).encode())
+        return digest.hexdigest()
+
+    def draw(self, ax, summary_df):
+        """
+        Draws the chart on a matplotlib Axes, e.g. one from pyplot for interactive display.
+        """
+        months = summary_df['Month'].astype(str)
+        ax.plot(months, summary_df['total_income'], label='Income', marker='o')
+        ax.plot(months, summary_df['total_expenses'], label='Expenses', marker='o')
+        self._decorate(ax)
+
+    def _decorate(self, ax):
+        ax.set_title(self.style['title'])
+        ax.set_xlabel(self.style['xlabel'])
+        ax.set_ylabel(self.style['ylabel'])
+        ax.legend()
+        ax.grid(True)
+        ax.tick_params(axis='x', labelrotation=45)
+
+    def _setup_figure(self):
+        # A standalone Figure keeps no pyplot global state, so it is safe outside the main thread
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=self.style['size'], dpi=self.style['dpi'])
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+        income_line, = ax.plot([], [], label='Income', marker='o')
+        expenses_line, = ax.plot([], [], label='Expenses', marker='o')
+        self._decorate(ax)
+        self._figure = (figure, canvas, ax, income_line, expenses_line)
+
+    def _render_uncached(self, summary_df):
+        if self._figure is None:
+            self._setup_figure()
+        figure, canvas, ax, income_line, expenses_line = self._figure
+
+        positions = np.arange(len(summary_df))
+        income_line.set_data(positions, summary_df['total_income'].to_numpy(dtype='float64'))
+        expenses_line.set_data(positions, summary_df['total_expenses'].to_numpy(dtype='float64'))
+        ax.set_xticks(positions, summary_df['Month'].astype(str).tolist())
+        ax.relim()
+        ax.autoscale_view()
+        figure.tight_layout()
+        canvas.draw()
+        image = np.asarray(canvas.buffer_rgba()).copy()
+        image.flags.writeable = False
+        return image
+
+    def render(self, summary_df):
+        """
+        Renders the chart into memory, reusing a cached image for data that was rendered before.
+
+        Parameters:
+            summary_df (DataFrame): 'Month', 'total_income' and 'total_expenses' columns, as produced by
+                                    ExpenseAnalysis.monthly_summary.
+
+        Returns:
+            ndarray: Read-only (height, width, 4) RGBA pixel array.
+        """
+        with get_metrics().timed('ChartRenderer.render') as measurement:
+            measurement.rows = len(summary_df)
+            key = self.cache_key(summary_df)
+            with self._lock:
+                image = self._cache.get(key)
+                if image is not None:
+                    self._cache.move_to_end(key)
+                    return image
+                image = self._render_uncached(summary_df)
+                self._cache[key] = image
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return image
+
+    def render_many(self, summaries):
+        """
+        Renders the charts of many accounts with the same figure.
+
+        Parameters:
+            summaries (iterable): Monthly summary DataFrames.
+
+        Returns:
+            list: One RGBA pixel array per summary.
+        """
+        return [self.render(summary_df) for summary_df in summaries]
+
+    def save(self, summary_df, image_file):
+        """
+        Writes the chart to an image file (or a binary file object) in PNG format.
+        """
+        from matplotlib.image import imsave
+        imsave(image_file, self.render(summary_df), format='png', dpi=self.style['dpi'])
+        self.logger.info(f"Chart saved to {image_file}")
@@ -1,26 +1,43 @@
-import matplotlib.pyplot as plt
 import logging
+import threading
+from src.analysis.monthly_aggregates import MonthlyAggregates
 
 class ExpenseVisualization:
-    def __init__(self, df):
+    def __init__(self, df, aggregates=None):
         self.df = df
         self.logger = logging.getLogger(__name__)
+        self._aggregates = aggregates
+        self._lock = threading.Lock()
 
-    def plot_expenses_vs_income(self):
-        self.df['Month'] = self.df['Date'].dt.to_period('M')
-        monthly_data = self.df.groupby('Month').agg(
-            total_income=('Amount', lambda x: x[x > 0].sum()),
-            total_expenses=('Amount', lambda x: abs(x[x < 0].sum()))
-        ).reset_index()
+    @property
+    def aggregates(self):
+        # Built once even when several threads plot from the same transactions
+        with self._lock:
+            if self._aggregates is None:
+                self._aggregates = MonthlyAggregates.from_transactions(self.df)
+            return self._aggregates
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(monthly_data['Month'].astype(str), monthly_data['total_income'], label='Income', marker='o')
-        plt.plot(monthly_data['Month'].astype(str), monthly_data['total_expenses'], label='Expenses', marker='o')
-        plt.title('Monthly Income vs Expenses')
-        plt.xlabel('Month')
-        plt.ylabel('Amount')
-        plt.legend()
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
+    def plot_expenses_vs_income(self, save_path=None, show=True, summary_df=None, renderer=None):
+        """
+        Plots monthly income against monthly expenses.
+
+        Parameters:
+        - save_path (str): Optional image file the chart is written to.
+        - show (bool): Display the chart in a window; headless runs pass False and only save it.
+        - summary_df (dataframe): Optional precomputed ExpenseAnalysis.monthly_summary; derived from the
+          aggregate cube when omitted.
+        - renderer (ChartRenderer): Renderer used for saving; the shared default renderer when omitted.
+        """
+        from src.visualizations.chart_renderer import get_default_renderer
+        monthly_data = summary_df if summary_df is not None else self.aggregates.monthly_totals()
+        renderer = renderer or get_default_renderer()
+
+        if save_path:
+            renderer.save(monthly_data, save_path)
+        if show:
+            import matplotlib.pyplot as plt
+            figure, ax = plt.subplots(figsize=renderer.style['size'])
+            renderer.draw(ax, monthly_data)
+            figure.tight_layout()
+            plt.show()
+            plt.close(figure)
@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.batch import account_names, discover_ledgers, process_ledger, run_batch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_FILE = os.path.join(ROOT_DIR, 'data', 'transactions_example.csv')
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.input_dir = os.path.join(self.tmp_dir, 'ledgers')
+        os.makedirs(self.input_dir)
+        for name in ['alice', 'bob']:
+            shutil.copy(EXAMPLE_FILE, os.path.join(self.input_dir, f'{name}.csv'))
+        with open(os.path.join(self.input_dir, 'broken.csv'), 'w') as f:
+            f.write("Something,Else\n1,2\n")
+
+    def test_discover_ledgers(self):
+        paths = discover_ledgers([self.input_dir, os.path.join(self.input_dir, 'a*.csv')])
+        self.assertEqual([os.path.basename(path) for path in paths], ['alice.csv', 'bob.csv', 'broken.csv'])
+
+    def test_discover_ledgers_skips_quarantine_and_cache_files(self):
+        for name in ['alice.csv.rejected.csv', 'alice.csv.cache.feather']:
+            shutil.copy(EXAMPLE_FILE, os.path.join(self.input_dir, name))
+        for inputs in [[self.input_dir], [os.path.join(self.input_dir, 'a*')]]:
+            paths = discover_ledgers(inputs)
+            self.assertNotIn('alice.csv.rejected.csv', [os.path.basename(path) for path in paths])
+            self.assertNotIn('alice.csv.cache.feather', [os.path.basename(path) for path in paths])
+
+    def test_account_names_are_unique(self):
+        names = account_names(['a/x.csv', 'b/x.csv', 'c/y file.csv'])
+        self.assertEqual(list(names.values()), ['x', 'x_2', 'y_file'])
+        names = account_names(['a/x.csv', 'b/x.csv', 'c/x_2.csv'])
+        self.assertEqual(list(names.values()), ['x', 'x_2', 'x_2_2'])
+
+    def test_process_ledger_converts_currencies(self):
+        ledger = os.path.join(self.tmp_dir, 'travel.csv')
+        rate_table = os.path.join(self.tmp_dir, 'rates.csv')
+        with open(ledger, 'w') as f:
+            f.write("Date,Category,Amount,Currency\n2024-01-02,Salary,1000,USD\n2024-01-03,Hotel,-90,EUR\n")
+        with open(rate_table, 'w') as f:
+            f.write("date,from,to,rate\n2024-01-02,USD,EUR,0.90\n")
+
+        result = process_ledger(ledger, 'travel', self.tmp_dir, rate_table=rate_table, offline=True)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['total_expenses'], 100)
+
+    def test_run_batch_isolates_failures(self):
+        output_dir = os.path.join(self.tmp_dir, 'out')
+        summary = run_batch(discover_ledgers([self.input_dir]), output_dir, max_workers=2)
+
+        self.assertEqual(list(summary['account']), ['alice', 'bob', 'broken'])
+        self.assertEqual(list(summary['status']), ['ok', 'ok', 'failed'])
+        self.assertIn('KeyError', summary.loc[2, 'error'])
+        for account in ['alice', 'bob']:
+            self.assertTrue(os.path.exists(os.path.join(output_dir, account, 'financial_report.pdf')))
+        self.assertTrue(os.path.exists(os.path.join(output_dir, 'summary.csv')))
+        self.assertGreater(summary.attrs['throughput'], 0)
+
+    def test_command_line_creates_log_directory(self):
+        log_file = os.path.join(self.tmp_dir, 'logs', 'batch.log')
+        result = subprocess.run([sys.executable, '-m', 'src.batch', os.path.join(self.input_dir, 'alice.csv'),
+                                 '--output-dir', os.path.join(self.tmp_dir, 'out'), '--workers', '1',
+                                 '--stages', 'summary', '--log-file', log_file],
+                                cwd=ROOT_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        with open(log_file) as f:
+            self.assertIn('INFO', f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from benchmarks.bench_pipeline import bench_size, compare, parse_size
+from benchmarks.synthetic import make_ledger, make_messy_ledger, make_rate_table
+
+
+class TestBenchPipeline(unittest.TestCase):
+
+    def test_synthetic_ledger_with_currencies(self):
+        ledger = make_ledger(rows=1000, months=6, currencies=['USD', 'EUR'])
+        rates = make_rate_table(['USD', 'EUR'], months=6)
+        self.assertEqual(set(ledger['Currency']), {'USD', 'EUR'})
+        self.assertEqual(set(rates['to']), {'EUR'})
+        self.assertLessEqual(ledger['Date'].max().strftime('%Y-%m-%d'), rates['date'].max())
+
+    def test_messy_ledger_breaks_a_share_of_rows(self):
+        messy = make_messy_ledger(rows=2000, months=6, date_format='%d/%m/%Y', error_rate=0.05)
+        broken = messy['Date'].isin(['n/a', '2023-02-30']) | messy.isna().any(axis=1) | (messy['Amount'] == 'twelve')
+        self.assertTrue(40 < broken.sum() < 160)
+        self.assertTrue(messy.loc[~broken, 'Date'].str.match(r'\d{2}/\d{2}/\d{4}$').all())
+
+    def test_parse_size(self):
+        self.assertEqual([parse_size(size) for size in ['10k', '1M', '2500', '1.5m']],
+                         [10_000, 1_000_000, 2_500, 1_500_000])
+
+    def test_bench_size_times_every_step(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            steps = bench_size(2000, tmp_dir, months=6, currencies=['USD', 'EUR'], repeat=1)
+        self.assertIn('load_transaction_data', steps)
+        self.assertIn('generate_pdf_report', steps)
+        self.assertTrue(all(step['seconds'] > 0 and step['peak_bytes'] is not None for step in steps.values()))
+
+    def test_compare_flags_slower_and_larger_steps(self):
+        baseline = {'sizes': {'1000': {'load': {'seconds': 1.0, 'peak_bytes': 100},
+                                       'report': {'seconds': 1.0, 'peak_bytes': 100}}}}
+        results = {'sizes': {'1000': {'load': {'seconds': 1.1, 'peak_bytes': 100},
+                                      'report': {'seconds': 2.0, 'peak_bytes': 200}}}}
+        regressions = compare(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(regression.startswith('report') for regression in regressions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.visualizations.chart_renderer import ChartRenderer
+
+
+def make_summary(months, income, expenses):
+    return pd.DataFrame({
+        'Month': pd.period_range('2024-01', periods=months, freq='M'),
+        'total_income': [income] * months,
+        'total_expenses': [expenses] * months,
+    })
+
+
+class TestChartRenderer(unittest.TestCase):
+
+    def test_render_returns_cached_read_only_image(self):
+        renderer = ChartRenderer()
+        summary_df = make_summary(3, 1000, 500)
+        image = renderer.render(summary_df)
+        self.assertEqual(image.shape, (600, 1000, 4))
+        self.assertFalse(image.flags.writeable)
+        self.assertIs(renderer.render(summary_df.copy()), image)
+
+    def test_cache_key_depends_on_data_and_style(self):
+        renderer = ChartRenderer()
+        key = renderer.cache_key(make_summary(3, 1000, 500))
+        self.assertNotEqual(key, renderer.cache_key(make_summary(3, 1000, 501)))
+        self.assertNotEqual(key, ChartRenderer(title='Other').cache_key(make_summary(3, 1000, 500)))
+
+    def test_render_many_reuses_one_figure(self):
+        renderer = ChartRenderer(cache_size=2)
+        summaries = [make_summary(months, 1000 + months, 500) for months in (2, 12, 5)]
+        images = renderer.render_many(summaries)
+        figure = renderer._figure[0]
+        self.assertEqual(len(images), 3)
+        # Evicted from the cache, rendered again on the same figure with the same result
+        self.assertTrue((renderer.render(summaries[0]) == images[0]).all())
+        self.assertIs(renderer._figure[0], figure)
+
+    def test_save_png(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image_file = os.path.join(tmp_dir, 'chart.png')
+            ChartRenderer().save(make_summary(2, 1000, 500), image_file)
+            with open(image_file, 'rb') as f:
+                self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.utils.currency_utils import CurrencyConverter
+from src.utils.exchange_rate_utils import ExchangeRate
+
+
+class TestCurrencyConverter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.rate_table = os.path.join(cls.tmp_dir.name, 'rates.csv')
+        with open(cls.rate_table, 'w') as f:
+            f.write("date,from,to,rate\n"
+                    "2024-01-02,USD,EUR,0.90\n"
+                    "2024-01-05,USD,EUR,0.80\n"
+                    "2024-01-02,USD,GBP,0.50\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def make_converter(self):
+        return CurrencyConverter(ExchangeRate(rate_table=self.rate_table, offline=True), 'USD')
+
+    def test_convert_uses_rate_of_transaction_date(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-06', '2024-01-04', '2024-01-04']),
+            'Category': ['Food', 'Rent', 'Food', 'Salary', 'Travel'],
+            'Amount': [-90, -900, -80, 1000, -50],
+            'Currency': ['EUR', 'EUR', 'EUR', 'USD', 'GBP']
+        })
+        converted = self.make_converter().convert(df)
+
+        self.assertEqual(list(converted['Amount']), [-100, -1000, -100, 1000, -100])
+        self.assertEqual(list(converted['OriginalAmount']), [-90, -900, -80, 1000, -50])
+        self.assertEqual(list(converted['OriginalCurrency']), ['EUR', 'EUR', 'EUR', 'USD', 'GBP'])
+        self.assertNotIn('Currency', converted.columns)
+        self.assertIn('Currency', df.columns)
+
+    def test_frames_without_currency_are_unchanged(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2024-01-02']), 'Amount': [-10]})
+        self.assertIs(self.make_converter().convert(df), df)
+
+    def test_missing_currency_defaults_to_base(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-02', '2024-01-02']),
+            'Amount': [-10, -9],
+            'Currency': [np.nan, 'EUR']
+        })
+        self.assertEqual(list(self.make_converter().convert(df)['Amount']), [-10, -10])
+
+    def test_unknown_currency_raises(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2024-01-02']), 'Amount': [-10], 'Currency': ['JPY']})
+        with self.assertRaises(ValueError):
+            self.make_converter().convert(df)
+
+    def test_rates_before_first_known_date_raise(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2023-12-01']), 'Amount': [-10], 'Currency': ['EUR']})
+        with self.assertRaises(ValueError):
+            self.make_converter().convert(df)
+
+    def test_string_dates_are_coerced(self):
+        df = pd.DataFrame({'Date': pd.Series(['2024-01-02', 'n/a', '2024-01-05'], dtype=object),
+                           'Amount': [-90, -10, -80], 'Currency': ['EUR', 'USD', 'EUR']})
+        converted = self.make_converter().convert(df)
+        self.assertEqual(list(converted['Amount']), [-100, -10, -100])
+
+    def test_known_pair_without_rates_in_range_is_fetched(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2023-12-01']), 'Amount': [-10], 'Currency': ['EUR']})
+        exchange_rate = ExchangeRate(rate_table=self.rate_table)
+        with patch.object(ExchangeRate, '_fetch_rate_series',
+                          return_value=[('2023-12-01', 'EUR', 0.5)]) as mock_fetch:
+            converted = CurrencyConverter(exchange_rate, 'USD').convert(df)
+        mock_fetch.assert_called_once_with('USD', ['EUR'], '2023-12-01', '2023-12-01')
+        self.assertEqual(list(converted['Amount']), [-20])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,17 @@
+import json
+import os
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import patch, MagicMock
 import logging
+import pandas as pd
 from src.utils.exchange_rate_utils import ExchangeRate  # Adjust the import based on your module structure
 
 class TestExchangeRate(unittest.TestCase):
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_exchange_rate_success(self, mock_get):
         # Mock a successful API response
         mock_response = MagicMock()
@@ -22,9 +28,9 @@ class TestExchangeRate(unittest.TestCase):
 
         # Assertions
         self.assertEqual(result, 1.2)
-        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD")
+        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD", timeout=10)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_exchange_rate_failure_status_code(self, mock_get):
         # Mock an API response with a failure status code
         mock_response = MagicMock()
@@ -36,9 +42,9 @@ class TestExchangeRate(unittest.TestCase):
 
         # Assertions
         self.assertIsNone(result)
-        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD")
+        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD", timeout=10)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_exchange_rate_exception(self, mock_get):
         # Mock an exception being raised during the request
         mock_get.side_effect = Exception("Network error")
@@ -50,7 +56,119 @@ class TestExchangeRate(unittest.TestCase):
 
         # Assertions
         self.assertEqual(str(context.exception), "Network error")
-        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD")
+        mock_get.assert_called_once_with("https://api.frankfurter.app/latest?from=EUR&to=USD", timeout=10)
+
+class _FrankfurterStandIn(BaseHTTPRequestHandler):
+    rates = {'USD': 1.1, 'GBP': 0.85, 'JPY': 160.0}
+    paths = []
+
+    def do_GET(self):
+        type(self).paths.append(self.path)
+        date, query = self.path.lstrip('/').split('?')
+        params = dict(part.split('=') for part in query.split('&'))
+        if '..' in date:
+            start, end = date.split('..')
+            days = pd.date_range(start, end, freq='B').strftime('%Y-%m-%d')
+            body = json.dumps({
+                'amount': 1.0,
+                'base': params['from'],
+                'rates': {day: {to: self.rates[to] for to in params['to'].split(',')} for day in days}
+            }).encode()
+        else:
+            body = json.dumps({
+                'amount': 1.0,
+                'base': params['from'],
+                # Like the real API, weekends and holidays answer with the previous business day's rate
+                'date': '2024-01-05' if date == 'latest' else
+                pd.offsets.BDay().rollback(pd.Timestamp(date)).strftime('%Y-%m-%d'),
+                'rates': {to: self.rates[to] for to in params['to'].split(',')}
+            }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestExchangeRateService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), _FrankfurterStandIn)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FrankfurterStandIn.paths = []
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_batched_request_and_memory_cache(self):
+        exchange_rate = ExchangeRate(base_url=self.base_url)
+        rates = exchange_rate.get_exchange_rates('EUR', ['USD', 'GBP', 'EUR'])
+        self.assertEqual(rates, {'USD': 1.1, 'GBP': 0.85, 'EUR': 1.0})
+        self.assertEqual(_FrankfurterStandIn.paths, ['/latest?from=EUR&to=USD,GBP'])
+
+        self.assertEqual(exchange_rate.get_exchange_rate('EUR', 'GBP'), 0.85)
+        self.assertEqual(len(_FrankfurterStandIn.paths), 1)
+
+    def test_expired_latest_rate_is_refetched(self):
+        exchange_rate = ExchangeRate(base_url=self.base_url, ttl=0)
+        exchange_rate.get_exchange_rate('EUR', 'USD')
+        exchange_rate.get_exchange_rate('EUR', 'USD')
+        self.assertEqual(len(_FrankfurterStandIn.paths), 2)
+
+    def test_disk_store_is_reused_across_instances(self):
+        store_path = os.path.join(self.tmp_dir.name, 'rates.sqlite')
+        ExchangeRate(base_url=self.base_url, store_path=store_path).get_exchange_rates('EUR', ['USD', 'JPY'], '2024-01-03')
+
+        exchange_rate = ExchangeRate(base_url=self.base_url, store_path=store_path, offline=True)
+        self.assertEqual(exchange_rate.get_exchange_rates('EUR', ['USD', 'JPY'], '2024-01-03'), {'USD': 1.1, 'JPY': 160.0})
+        self.assertEqual(len(_FrankfurterStandIn.paths), 1)
+
+    def test_weekend_rate_is_stored_under_the_requested_date(self):
+        store_path = os.path.join(self.tmp_dir.name, 'rates.sqlite')
+        ExchangeRate(base_url=self.base_url, store_path=store_path).get_exchange_rate('EUR', 'USD', '2024-01-06')
+
+        offline = ExchangeRate(base_url=self.base_url, store_path=store_path, offline=True)
+        self.assertEqual(offline.get_exchange_rate('EUR', 'USD', '2024-01-06'), 1.1)
+        self.assertEqual(offline.get_exchange_rate('EUR', 'USD', '2024-01-05'), 1.1)
+
+    def test_rate_series_single_request_and_store(self):
+        store_path = os.path.join(self.tmp_dir.name, 'rates.sqlite')
+        exchange_rate = ExchangeRate(base_url=self.base_url, store_path=store_path)
+        series = exchange_rate.get_rate_series('EUR', ['USD', 'GBP', 'EUR'], '2024-01-08', '2024-01-12')
+        self.assertEqual(_FrankfurterStandIn.paths, ['/2024-01-01..2024-01-12?from=EUR&to=USD,GBP'])
+        self.assertEqual(set(series['currency']), {'USD', 'GBP', 'EUR'})
+        self.assertTrue(series['date'].is_monotonic_increasing)
+
+        offline = ExchangeRate(base_url=self.base_url, store_path=store_path, offline=True)
+        stored = offline.get_rate_series('EUR', ['USD'], '2024-01-09', '2024-01-10')
+        self.assertEqual(len(_FrankfurterStandIn.paths), 1)
+        self.assertTrue((stored['rate'] == 1.1).all())
+        self.assertLessEqual(stored['date'].min(), pd.Timestamp('2024-01-09'))
+
+    def test_offline_rate_table(self):
+        rate_table = os.path.join(self.tmp_dir.name, 'rates.csv')
+        with open(rate_table, 'w') as f:
+            f.write("date,from,to,rate\n2024-01-02,EUR,USD,1.09\n2024-01-05,EUR,USD,1.10\n")
+
+        exchange_rate = ExchangeRate(base_url=self.base_url, rate_table=rate_table, offline=True)
+        self.assertEqual(exchange_rate.get_exchange_rate('EUR', 'USD', '2024-01-02'), 1.09)
+        # Weekend dates fall back to the last known rate
+        self.assertEqual(exchange_rate.get_exchange_rate('EUR', 'USD', '2024-01-04'), 1.09)
+        self.assertEqual(exchange_rate.get_exchange_rate('EUR', 'USD'), 1.10)
+        self.assertAlmostEqual(exchange_rate.get_exchange_rate('USD', 'EUR', '2024-01-05'), 1 / 1.10)
+        self.assertIsNone(exchange_rate.get_exchange_rate('EUR', 'GBP'))
+        self.assertEqual(_FrankfurterStandIn.paths, [])
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 import pandas as pd
 from src.analysis.expense_analysis import ExpenseAnalysis
 import logging
@@ -38,6 +40,24 @@ class TestExpenseAnalysis(unittest.TestCase):
         self.assertIsInstance(recommendations, list, "Recommendations should be a list.")
         self.logger.info("Savings recommendations test passed.")
 
+    def test_savings_recommendation_records(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-05', '2024-01-06', '2024-02-01', '2024-02-03']),
+            'Category': ['Salary', 'Rent', 'Food', 'Salary', 'Rent'],
+            'Amount': [1000, -500, -50, 1000, -80]
+        })
+        analysis = ExpenseAnalysis(df)
+        records = analysis.savings_recommendation_records(income_threshold=0.1, reduction_percentage=0.15)
+        self.assertEqual(list(records['Category']), ['Rent'])
+        self.assertEqual(str(records.loc[0, 'Month']), '2024-01')
+        self.assertAlmostEqual(records.loc[0, 'expense_ratio'], 0.5)
+        self.assertAlmostEqual(records.loc[0, 'excess_percentage'], 40.0)
+        self.assertAlmostEqual(records.loc[0, 'suggested_reduction'], 15.0)
+
+        recommendations = analysis.savings_recommendations(income_threshold=0.1, reduction_percentage=0.15)
+        self.assertEqual(len(recommendations), 1)
+        self.assertIn("In 2024-01, the 'Rent' expenses were 40.0% over the 10.0%", recommendations[0])
+
     def test_calculate_monthly_savings_goal_reduction(self):
         monthly_reductions = self.expense_analysis.calculate_monthly_savings_goal_reduction(savings_goal=500)
         self.assertIsInstance(monthly_reductions, dict, "Monthly reductions should be a dictionary.")
@@ -45,5 +65,96 @@ class TestExpenseAnalysis(unittest.TestCase):
             self.assertIsInstance(message, str, "Each value in the monthly reductions dictionary should be a string.")
         self.logger.info("Calculate monthly savings goal reduction test passed.")
 
+    def test_rolling_category_averages_match_pandas_rolling(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-20', '2024-02-10', '2024-04-02', '2024-05-15', '2024-05-16']),
+            'Category': ['Food', 'Rent', 'Food', 'Food', 'Rent', 'Salary'],
+            'Amount': [-100, -800, -150.25, -90, -850, 3000],
+        })
+        rolling = ExpenseAnalysis(df).rolling_category_averages(windows=(2, 3))
+
+        # March has no transactions and still counts as a month without spending
+        expected = df[df['Amount'] < 0].assign(Month=df['Date'].dt.to_period('M'), expense=-df['Amount'])
+        expected = expected.pivot_table(index='Month', columns='Category', values='expense', aggfunc='sum')
+        expected = expected.reindex(pd.period_range('2024-01', '2024-05', freq='M'), fill_value=0).fillna(0)
+        for window in (2, 3):
+            averages = expected.rolling(window, min_periods=1).mean().stack()
+            actual = rolling.set_index(['Month', 'Category'])[f'avg_{window}m']
+            pd.testing.assert_series_equal(actual, averages.reindex(actual.index), check_names=False)
+        # Rent drops out in April, with nothing spent in the last three months
+        self.assertEqual(len(rolling), 9)
+
+    def test_rolling_expense_ratios(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-20', '2024-02-10', '2024-03-02']),
+            'Category': ['Salary', 'Rent', 'Rent', 'Salary'],
+            'Amount': [1000, -500, -700, 2000],
+        })
+        ratios = ExpenseAnalysis(df).rolling_expense_ratios(windows=(1, 2))
+        self.assertEqual(list(ratios['Month'].astype(str)), ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(list(ratios['ratio_1m'].fillna(-1)), [0.5, -1, 0])
+        self.assertEqual(list(ratios['ratio_2m']), [0.5, 1.2, 0.35])
+
+    def test_savings_goal_matrix_matches_single_goal(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-02-10', '2024-02-20', '2024-03-05']),
+            'Category': ['Salary', 'Rent', 'Salary', 'Rent', 'Food'],
+            'Amount': [3000, -2000, 1000, -200, -50],
+        })
+        analysis = ExpenseAnalysis(df)
+        goals = [0, 500, 1500]
+        matrix = analysis.savings_goal_matrix(goals)
+
+        self.assertEqual(matrix.shape, (3, 3))
+        self.assertEqual(list(matrix.index), goals)
+        self.assertEqual(list(matrix.loc[1500].round(2)[:2]), [25.0, 350.0])
+        self.assertTrue(matrix[pd.Period('2024-03', 'M')].isna().all())
+        for goal in goals:
+            reductions = analysis.calculate_monthly_savings_goal_reduction(goal)
+            needed = matrix.loc[goal].dropna()
+            self.assertEqual(list(reductions), list(needed.index))
+            for month, reduction in needed.items():
+                self.assertIn("No reduction" if reduction == 0 else f"{reduction:.2f}%", reductions[month])
+
+    def test_income_threshold_matrix_matches_records(self):
+        thresholds = [0.1, 0.3, 0.5]
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-01-20']),
+            'Category': ['Salary', 'Rent', 'Food'],
+            'Amount': [2000, -800, -100],
+        })
+        analysis = ExpenseAnalysis(df)
+        matrix = analysis.income_threshold_matrix(thresholds)
+        self.assertEqual(list(matrix.columns), thresholds)
+        for threshold in thresholds:
+            records = analysis.savings_recommendation_records(threshold).set_index(['Month', 'Category'])
+            self.assertEqual(matrix[threshold].dropna().to_dict(), records['excess_percentage'].to_dict())
+        self.assertEqual(matrix.loc[(pd.Period('2024-01', 'M'), 'Rent')].tolist()[:2], [30.0, 10.0])
+
+    def test_frame_dumps_only_when_debugging(self):
+        analysis = ExpenseAnalysis(self.df)
+        with patch.object(pd.DataFrame, 'to_string') as mock_to_string:
+            with self.assertLogs('src.analysis.expense_analysis', level='INFO'):
+                analysis.logger.info("info level")
+                analysis.sort_by_category()
+                analysis.monthly_summary()
+            mock_to_string.assert_not_called()
+            with self.assertLogs('src.analysis.expense_analysis', level='DEBUG'):
+                analysis.monthly_summary()
+            mock_to_string.assert_called_once()
+
+    def test_concurrent_methods_share_one_read_only_view(self):
+        df = self.df.copy()
+        analysis = ExpenseAnalysis(df)
+        methods = [analysis.sort_by_category, analysis.monthly_summary,
+                   lambda: analysis.savings_recommendations(0.1, 0.15),
+                   lambda: analysis.calculate_monthly_savings_goal_reduction(500)] * 4
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda method: method(), methods))
+        self.assertEqual(len(results), len(methods))
+        pd.testing.assert_frame_equal(df, self.df)
+        self.assertIs(analysis.view, analysis.view)
+        self.assertFalse(analysis.view.cents.flags.writeable)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import os
+import re
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.reports.expense_report import ReportGenerator, format_rolling_rows, format_summary_rows
+
+
+class TestReportGenerator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.summary_df = pd.DataFrame({
+            'Month': pd.PeriodIndex(['2024-01', '2024-02'], freq='M'),
+            'total_income': [1000, 1250.5],
+            'total_expenses': [500, 1300.125],
+        })
+        cls.recommendations = ["All expenses are within the desired limits for each category."]
+        cls.monthly_reductions = {pd.Period('2024-01', 'M'): "No reduction needed."}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def count_pages(self, file_name):
+        with open(file_name, 'rb') as f:
+            return len(re.findall(rb'/Type /Page\b', f.read()))
+
+    def test_format_summary_rows(self):
+        self.assertEqual(format_summary_rows(self.summary_df), [
+            "2024-01: Income: 1000.00, Expenses: 500.00",
+            "2024-02: Income: 1250.50, Expenses: 1300.12",
+        ])
+
+    def test_format_rolling_rows(self):
+        ratios = pd.DataFrame({
+            'Month': pd.PeriodIndex(['2024-01', '2024-02'], freq='M'),
+            'ratio_3m': [0.5, float('nan')],
+            'ratio_12m': [0.5, 1.23456],
+        })
+        self.assertEqual(format_rolling_rows(ratios), [
+            "2024-01: 3 months: 50.0%, 12 months: 50.0%",
+            "2024-02: 3 months: n/a, 12 months: 123.5%",
+        ])
+
+    def test_generate_pdf_report_writes_only_the_pdf(self):
+        file_name = os.path.join(self.tmp_dir.name, 'report.pdf')
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        try:
+            ReportGenerator().generate_pdf_report(self.summary_df, self.recommendations, self.monthly_reductions,
+                                                  file_name=file_name)
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['report.pdf'])
+        self.assertEqual(self.count_pages(file_name), 2)
+
+    def test_generator_can_be_reused_and_run_concurrently(self):
+        generator = ReportGenerator()
+        first = os.path.join(self.tmp_dir.name, 'first.pdf')
+        generator.generate_pdf_report(self.summary_df, self.recommendations, self.monthly_reductions, file_name=first)
+        second = os.path.join(self.tmp_dir.name, 'second.pdf')
+        generator.generate_pdf_report(self.summary_df, self.recommendations, self.monthly_reductions, file_name=second)
+        self.assertEqual(self.count_pages(second), 2)
+
+        file_names = [os.path.join(self.tmp_dir.name, f'parallel_{i}.pdf') for i in range(4)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda name: ReportGenerator().generate_pdf_report(
+                self.summary_df, self.recommendations, self.monthly_reductions, file_name=name), file_names))
+        for file_name in file_names:
+            self.assertEqual(self.count_pages(file_name), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
+import os
+import tempfile
 import unittest
 import pandas as pd
 from unittest.mock import patch, mock_open
-from src.utils.expense_utils import TransactionDataLoader
+from src.utils.expense_utils import TransactionDataLoader, _import_pyarrow, detect_date_format, parse_dates, record_lines
 
 class TestTransactionDataLoader(unittest.TestCase):
     @patch('pandas.read_csv')
@@ -31,6 +33,21 @@ class TestTransactionDataLoader(unittest.TestCase):
         mock_logger = mock_get_logger.return_value
         mock_logger.info.assert_called_with("Transaction data loaded successfully.")
 
+    @patch('pandas.read_csv')
+    def test_load_transaction_data_amount_cents(self, mock_read_csv):
+        mock_read_csv.return_value = pd.DataFrame({
+            'Date': ['2024-01-01', '2024-01-02', '2024-01-03'],
+            'Amount': [1000, -50.55, None],
+            'Category': ['Salary', 'Groceries', 'Dining']
+        })
+
+        with self.assertLogs('src.utils.expense_utils', 'WARNING'):
+            df = TransactionDataLoader(use_cache=False, amount_cents=True).load_transaction_data('fake_path.csv')
+
+        self.assertNotIn('Amount', df.columns)
+        self.assertEqual(df['AmountCents'].dtype, 'int32')
+        self.assertEqual(list(df['AmountCents']), [100000, -5055])
+
     @patch('pandas.read_csv')
     @patch('logging.getLogger')
     def test_load_transaction_data_failure(self, mock_get_logger, mock_read_csv):
@@ -47,5 +64,247 @@ class TestTransactionDataLoader(unittest.TestCase):
         mock_logger = mock_get_logger.return_value
         mock_logger.error.assert_called_with("Error loading transaction data: File not found.")
 
+    def test_load_transaction_aggregates_matches_full_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            pd.DataFrame({
+                'Date': ['2024-01-01', '2024-01-02', '2024-01-15', '2024-02-01', 'not a date'],
+                'Category': ['Salary', 'Groceries', 'Rent', 'Groceries', 'Rent'],
+                'Amount': [1000, -50.5, -500, -20.25, -1]
+            }).to_csv(file_path, index=False)
+
+            transaction_loader = TransactionDataLoader()
+            aggregates = transaction_loader.load_transaction_aggregates(file_path, chunksize=2)
+            chunks = list(transaction_loader.iter_transaction_chunks(file_path, chunksize=2))
+            rejected = pd.read_csv(TransactionDataLoader.quarantine_path(file_path))
+
+        # The last chunk only held the row without a readable date
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2])
+        self.assertEqual(list(rejected['line']), [6])
+        self.assertEqual(list(rejected['reason']), ['invalid_date'])
+        self.assertEqual(chunks[0]['Category'].dtype, 'category')
+        self.assertEqual(chunks[0]['AmountCents'].dtype, 'int32')
+        self.assertNotIn('Amount', chunks[0].columns)
+        totals = aggregates.monthly_totals()
+        self.assertEqual(list(totals['total_income']), [1000, 0])
+        self.assertEqual(list(totals['total_expenses']), [550.5, 20.25])
+
+    @unittest.skipIf(_import_pyarrow() is None, "pyarrow is not installed")
+    def test_load_transaction_data_uses_cache_until_source_changes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            pd.DataFrame({
+                'Date': ['2024-01-01', '2024-01-02'],
+                'Amount': [1000, -500],
+                'Category': ['Salary', 'Groceries']
+            }).to_csv(file_path, index=False)
+
+            transaction_loader = TransactionDataLoader()
+            first = transaction_loader.load_transaction_data(file_path)
+            self.assertTrue(os.path.exists(TransactionDataLoader.cache_path(file_path)))
+
+            with patch('pandas.read_csv', wraps=pd.read_csv) as mock_read_csv:
+                second = transaction_loader.load_transaction_data(file_path)
+                mock_read_csv.assert_not_called()
+            pd.testing.assert_frame_equal(first, second)
+
+            # Touching the file without changing it keeps the cache valid
+            os.utime(file_path, ns=(0, 0))
+            with patch('pandas.read_csv', wraps=pd.read_csv) as mock_read_csv:
+                transaction_loader.load_transaction_data(file_path)
+                mock_read_csv.assert_not_called()
+
+            with open(file_path, 'a') as f:
+                f.write('2024-01-03,-20,Dining\n')
+            with patch('pandas.read_csv', wraps=pd.read_csv) as mock_read_csv:
+                third = transaction_loader.load_transaction_data(file_path)
+                mock_read_csv.assert_called_once()
+            self.assertEqual(len(third), 3)
+
+    @unittest.skipIf(_import_pyarrow() is None, "pyarrow is not installed")
+    def test_cache_keeps_the_date_format(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n01/02/2024,Rent,-500\n")
+            self.assertEqual(TransactionDataLoader().load_transaction_data(file_path)['Date'][0],
+                             pd.Timestamp('2024-01-02'))
+
+            # A cache parsed month first does not answer a day-first load, and the other way round
+            df = TransactionDataLoader(date_format='%d/%m/%Y').load_transaction_data(file_path)
+            self.assertEqual(df['Date'][0], pd.Timestamp('2024-02-01'))
+            with patch('pandas.read_csv', wraps=pd.read_csv) as mock_read_csv:
+                df = TransactionDataLoader(date_format='%d/%m/%Y').load_transaction_data(file_path)
+                mock_read_csv.assert_not_called()
+            self.assertEqual(df['Date'][0], pd.Timestamp('2024-02-01'))
+            self.assertEqual(TransactionDataLoader().load_transaction_data(file_path)['Date'][0],
+                             pd.Timestamp('2024-01-02'))
+
+            # A cache hit remembers the format for appended rows
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n31/01/2024,Rent,-1500\n")
+            offset = os.path.getsize(file_path)
+            TransactionDataLoader().load_transaction_data(file_path)
+            transaction_loader = TransactionDataLoader()
+            with patch('pandas.read_csv', wraps=pd.read_csv) as mock_read_csv:
+                transaction_loader.load_transaction_data(file_path)
+                mock_read_csv.assert_not_called()
+            with open(file_path, 'a') as f:
+                f.write("05/02/2024,Rent,-500\n")
+            appended, _ = transaction_loader.load_appended_transactions(file_path, offset)
+            self.assertEqual(appended['Date'][0], pd.Timestamp('2024-02-05'))
+
+    def test_update_aggregates_reads_only_appended_rows(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            state_path = os.path.join(tmp_dir, 'state.json')
+            # The writer has only written half of the last line so far
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n2024-01-01,Salary,1000\n2024-01-02,Rent,-5")
+
+            transaction_loader = TransactionDataLoader()
+            aggregates = transaction_loader.update_aggregates(file_path, state_path)
+            self.assertEqual(aggregates.rows, 1)
+
+            with open(file_path, 'a') as f:
+                f.write("00\n2024-02-01,Salary,1200\n2024-02-03,Rent,-600\n")
+            new_rows, _ = transaction_loader.load_appended_transactions(file_path, aggregates.metadata['offset'])
+            self.assertEqual(list(new_rows['Amount']), [-500, 1200, -600])
+            aggregates = transaction_loader.update_aggregates(file_path, state_path)
+            self.assertEqual(aggregates.rows, 4)
+
+            # Nothing appended: the state stays the same
+            aggregates = transaction_loader.update_aggregates(file_path, state_path)
+            totals = aggregates.monthly_totals()
+            self.assertEqual(list(totals['total_income']), [1000, 1200])
+            self.assertEqual(list(totals['total_expenses']), [500, 600])
+
+            df, offset = transaction_loader.load_appended_transactions(file_path, aggregates.metadata['offset'])
+            self.assertTrue(df.empty)
+            self.assertEqual(offset, os.path.getsize(file_path))
+
+            # A replaced file of at least the same size is not mistaken for an appended one
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n2024-03-01,Salary,2000\n2024-03-02,Rent,-700\n"
+                        "2024-03-03,Dining,-25\n2024-03-04,Dining,-35\n")
+            aggregates = transaction_loader.update_aggregates(file_path, state_path)
+            self.assertEqual(aggregates.rows, 4)
+            totals = aggregates.monthly_totals()
+            self.assertEqual(list(totals['total_income']), [2000])
+            self.assertEqual(list(totals['total_expenses']), [760])
+
+    def test_parse_dates_detects_day_first_format(self):
+        raw = pd.Series(['31/01/2024', '05/02/2024', None, '31/01/2024', 'n/a'])
+        self.assertEqual(detect_date_format(raw), '%d/%m/%Y')
+        dates = parse_dates(raw)
+        self.assertEqual(list(dates[:2]), [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-05')])
+        self.assertEqual(dates[3], dates[0])
+        self.assertTrue(dates[[2, 4]].isna().all())
+        # Already parsed columns are returned as they are
+        self.assertIs(parse_dates(dates), dates)
+
+    def test_validated_load_quarantines_rejected_rows(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n"
+                        "2024-01-01,Salary,1000\n"
+                        ",Rent,-500\n"
+                        "2024-02-30,Rent,-500\n"
+                        "2024-01-03,Dining,twelve\n"
+                        "2024-01-04,,-20\n"
+                        "2024-01-05,Dining,-30.5\n")
+
+            df = TransactionDataLoader(validate=True).load_transaction_data(file_path)
+            self.assertEqual(list(df['Amount']), [1000, -30.5])
+            self.assertEqual(df.attrs['rejected_rows'], {'missing_date': 1, 'invalid_date': 1,
+                                                         'invalid_amount': 1, 'missing_category': 1})
+
+            rejected = pd.read_csv(TransactionDataLoader.quarantine_path(file_path))
+            self.assertEqual(list(rejected['line']), [3, 4, 5, 6])
+            self.assertEqual(list(rejected['reason']),
+                             ['missing_date', 'invalid_date', 'invalid_amount', 'missing_category'])
+
+            # A clean reload removes the stale quarantine file
+            pd.DataFrame({'Date': ['2024-01-01'], 'Category': ['Salary'], 'Amount': [1000]}).to_csv(
+                file_path, index=False)
+            df = TransactionDataLoader(validate=True).load_transaction_data(file_path)
+            self.assertEqual(df.attrs['rejected_rows'], {})
+            self.assertFalse(os.path.exists(TransactionDataLoader.quarantine_path(file_path)))
+
+    def test_quarantine_reports_physical_lines(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n"
+                        "2024-01-01,Salary,1000\n"
+                        "\n"
+                        "2024-01-02,,-20\n"
+                        "2024-01-03,\"Dining\nout\",-30\n"
+                        "n/a,Rent,-500\n")
+
+            df = TransactionDataLoader(validate=True).load_transaction_data(file_path)
+            self.assertEqual(len(df), 2)
+            rejected = pd.read_csv(TransactionDataLoader.quarantine_path(file_path))
+            self.assertEqual(list(rejected['line']), [4, 7])
+            self.assertEqual(list(rejected['reason']), ['missing_category', 'missing_date'])
+
+    def test_streamed_chunks_use_the_detected_format(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n31/01/2024,Salary,1000\n05/02/2024,Rent,-500\n"
+                        "03/02/2024,Dining,-20\nsoon,Dining,-5\n")
+
+            transaction_loader = TransactionDataLoader()
+            with self.assertLogs('src.utils.expense_utils', 'WARNING'):
+                chunks = list(transaction_loader.iter_transaction_chunks(file_path, chunksize=2))
+            dates = pd.concat(chunks)['Date']
+            self.assertEqual(list(dates), [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-05'),
+                                           pd.Timestamp('2024-02-03')])
+            rejected = pd.read_csv(TransactionDataLoader.quarantine_path(file_path))
+            self.assertEqual(list(rejected['Date']), ['soon'])
+            self.assertEqual(list(rejected['line']), [5])
+
+    def test_streamed_format_is_detected_on_the_whole_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            # The first 500 rows only have days up to 12, which alone read month first
+            days = pd.date_range('2024-01-01', periods=12).append(pd.date_range('2024-01-13', periods=19))
+            dates = [days[i % 12] for i in range(500)] + [days[i % len(days)] for i in range(4500)]
+            pd.DataFrame({'Date': [date.strftime('%d/%m/%Y') for date in dates], 'Category': 'Dining',
+                          'Amount': -1}).to_csv(file_path, index=False)
+
+            aggregates = TransactionDataLoader().load_transaction_aggregates(file_path, chunksize=500)
+            self.assertEqual(aggregates.rows, 5000)
+            self.assertEqual(list(aggregates.monthly_totals()['total_expenses']), [5000])
+            self.assertFalse(os.path.exists(TransactionDataLoader.quarantine_path(file_path)))
+
+    def test_record_lines_across_blocks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            with open(file_path, 'wb') as f:
+                f.write(b"Date,Amount\r\n2024-01-01,1\r\n\r\n\n2024-01-02,2\r\n2024-01-03,3")
+            for block_size in [1, 2, 3, 7, 1 << 16]:
+                self.assertEqual(list(record_lines(file_path, 3, block_size)), [2, 5, 6])
+            self.assertIsNone(record_lines(file_path, 4))
+
+    def test_appended_rows_reuse_the_detected_format(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'transactions.csv')
+            state_path = os.path.join(tmp_dir, 'state.json')
+            with open(file_path, 'w') as f:
+                f.write("Date,Category,Amount\n31/01/2024,Salary,1000\n")
+            TransactionDataLoader().update_aggregates(file_path, state_path)
+
+            # Alone, these days would be read month first
+            with open(file_path, 'a') as f:
+                f.write("05/02/2024,Rent,-500\n03/02/2024,Dining,-20\n")
+            aggregates = TransactionDataLoader().update_aggregates(file_path, state_path)
+            self.assertEqual(aggregates.metadata['date_format'], '%d/%m/%Y')
+            totals = aggregates.monthly_totals()
+            self.assertEqual(list(totals['Month'].astype(str)), ['2024-01', '2024-02'])
+            self.assertEqual(list(totals['total_expenses']), [0, 520])
+
 if __name__ == '__main__':
     unittest.main()
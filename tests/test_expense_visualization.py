@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -27,5 +29,17 @@ class TestExpenseVisualization(unittest.TestCase):
         # Verify that plt.show() was called
         mock_show.assert_called_once()
 
+    @patch('matplotlib.pyplot.show')
+    def test_plot_expenses_vs_income_headless(self, mock_show):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-20', '2024-02-05']),
+            'Amount': [1000, -500, -600]
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_path = os.path.join(tmp_dir, 'chart.png')
+            ExpenseVisualization(df).plot_expenses_vs_income(save_path=save_path, show=False)
+            self.assertTrue(os.path.exists(save_path))
+        mock_show.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from src.utils.instrumentation import Metrics, get_metrics, instrumented
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_timed_records_calls_and_rows(self):
+        metrics = Metrics()
+        for rows in (3, 4):
+            with metrics.timed('load') as measurement:
+                measurement.rows = rows
+        stats = metrics.to_dict()['load']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['rows'], 7)
+        self.assertGreaterEqual(stats['seconds'], stats['max_seconds'])
+        self.assertIsNone(stats['peak_bytes'])
+
+    def test_peak_memory_is_measured_per_call(self):
+        metrics = Metrics()
+        tracemalloc.start()
+        try:
+            with metrics.timed('outer'):
+                with metrics.timed('large'):
+                    block = bytearray(8 << 20)
+                    del block
+                with metrics.timed('small'):
+                    block = bytearray(1 << 10)
+        finally:
+            tracemalloc.stop()
+        stats = metrics.to_dict()
+        self.assertGreater(stats['large']['peak_bytes'], 7 << 20)
+        self.assertLess(stats['small']['peak_bytes'], 1 << 20)
+        # Resetting the traced peak for the inner calls does not hide it from the enclosing one
+        self.assertGreater(stats['outer']['peak_bytes'], 7 << 20)
+
+    def test_nested_instrumented_calls_are_counted_once(self):
+        @instrumented(name='test_instrumentation.inner')
+        def inner():
+            return [1, 2]
+
+        @instrumented(name='test_instrumentation.outer')
+        def outer():
+            return inner() + inner()
+
+        before = get_metrics().to_dict()
+        outer()
+        after = get_metrics().to_dict()
+        self.assertEqual(after['test_instrumentation.outer']['rows'],
+                         before.get('test_instrumentation.outer', {'rows': 0})['rows'] + 4)
+        self.assertEqual(after.get('test_instrumentation.inner'), before.get('test_instrumentation.inner'))
+        inner()
+        self.assertEqual(get_metrics().to_dict()['test_instrumentation.inner']['calls'],
+                         before.get('test_instrumentation.inner', {'calls': 0})['calls'] + 1)
+
+    def test_instrumented_uses_result_length(self):
+        @instrumented(name='test_instrumentation.rows')
+        def rows():
+            return [1, 2, 3]
+
+        before = get_metrics().to_dict().get('test_instrumentation.rows', {'rows': 0})['rows']
+        rows()
+        self.assertEqual(get_metrics().to_dict()['test_instrumentation.rows']['rows'], before + 3)
+
+    def test_failed_calls_are_measured(self):
+        metrics = Metrics()
+        with self.assertRaises(ValueError):
+            with metrics.timed('broken'):
+                raise ValueError("bad input")
+        self.assertEqual(metrics.to_dict()['broken']['calls'], 1)
+
+    def test_exports(self):
+        metrics = Metrics()
+        metrics.record('ExpenseAnalysis.monthly_summary', 0.5, rows=12)
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE sympera_operation_seconds_total counter', text)
+        self.assertIn('sympera_operation_rows_total{operation="ExpenseAnalysis.monthly_summary"} 12', text)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, 'metrics.json')
+            prom_path = os.path.join(tmp_dir, 'metrics.prom')
+            metrics.write(json_path)
+            metrics.write(prom_path)
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)['ExpenseAnalysis.monthly_summary']['calls'], 1)
+            with open(prom_path) as f:
+                self.assertEqual(f.read(), text)
+            if os.name == 'posix':
+                self.assertEqual(os.stat(prom_path).st_mode & 0o777, 0o644)
+
+
+if __name__ == '__main__':
+    unittest.main()
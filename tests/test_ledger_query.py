@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.analysis.expense_analysis import ExpenseAnalysis
+from src.analysis.ledger_query import LedgerQuery
+
+
+class TestLedgerQuery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-15', '2024-01-31', '2024-02-01', '2024-02-10',
+                                    '2024-04-05', '2024-04-05', '2024-04-30', None]),
+            'Category': ['Salary', 'Dining', 'Rent', 'Dining', 'Rent', 'Salary', 'Rent', 'Dining', 'Dining'],
+            'Amount': [3000, -45.5, -1200, -30.25, -1250, 2000, -1300, -12, -999],
+        })
+        cls.query = LedgerQuery.from_transactions(cls.df)
+
+    def brute_force_spend(self, category, start, end):
+        rows = self.df[(self.df['Date'] >= start) & (self.df['Date'] <= end) & (self.df['Amount'] < 0)]
+        if category is not None:
+            rows = rows[rows['Category'] == category]
+        return round(-rows['Amount'].sum(), 2)
+
+    def test_spend_matches_scan(self):
+        for category in [None, 'Dining', 'Rent', 'Salary']:
+            for start, end in [('2024-01-01', '2024-12-31'), ('2024-01-15', '2024-02-01'), ('2024-01-16', '2024-01-30'),
+                               ('2024-04-05', '2024-04-05'), ('2024-03-01', '2024-01-01')]:
+                with self.subTest(category=category, start=start, end=end):
+                    self.assertEqual(self.query.spend(category, start, end),
+                                     self.brute_force_spend(category, start, end))
+
+    def test_open_ranges_income_count_and_unknown_category(self):
+        self.assertEqual(self.query.spend('Dining'), 87.75)
+        self.assertEqual(self.query.spend('Rent', start='2024-02-01'), 2550)
+        self.assertEqual(self.query.income(end='2024-03-31'), 3000)
+        self.assertEqual(self.query.count('Dining'), 3)
+        self.assertEqual(self.query.spend('Travel', '2024-01-01', '2024-12-31'), 0)
+
+    def test_months_exceeding_share_of_income(self):
+        months = self.query.months_exceeding('Rent', 0.3)
+        # March had no transactions at all, February spent on Rent without any income
+        self.assertEqual(list(months['Month'].astype(str)), ['2024-01', '2024-02', '2024-04'])
+        self.assertEqual(list(months['expense']), [1200, 1250, 1300])
+        self.assertEqual(len(self.query.months_exceeding('Rent', 0.7)), 1)
+        self.assertEqual(months['share'].iloc[0], 0.4)
+        self.assertTrue(np.isnan(months['share'].iloc[1]))
+
+        monthly = self.query.monthly_spend('Dining', '2024-01-20', '2024-04-29')
+        self.assertEqual(list(monthly['Month'].astype(str)), ['2024-01', '2024-02', '2024-03', '2024-04'])
+        self.assertEqual(list(monthly['expense']), [0, 30.25, 0, 0])
+        self.assertEqual(list(monthly['income']), [0, 0, 0, 2000])
+
+    def test_reversed_ranges_are_empty(self):
+        self.assertEqual(len(self.query.monthly_spend('Rent', '2024-03-25', '2024-01-01')), 0)
+        self.assertEqual(len(self.query.monthly_spend('Rent', '2024-01-25', '2024-01-01')), 0)
+        self.assertEqual(len(self.query.months_exceeding('Rent', 0.3, '2024-01-25', '2024-01-01')), 0)
+        self.assertEqual(len(self.query.monthly_spend('Rent', start='2024-05-01')), 0)
+        self.assertEqual(self.query.spend('Rent', '2024-01-25', '2024-01-01'), 0)
+
+    def test_expense_analysis_shares_one_query_index(self):
+        analysis = ExpenseAnalysis(self.df)
+        self.assertIs(analysis.query, analysis.query)
+        self.assertEqual(analysis.query.spend('Rent', '2024-01-01', '2024-01-31'), 1200)
+
+    def test_query_covers_appended_transactions(self):
+        analysis = ExpenseAnalysis(self.df)
+        self.assertEqual(analysis.query.spend('Rent'), 3750)
+        analysis.append_transactions(pd.DataFrame({'Date': pd.to_datetime(['2024-05-01']), 'Category': ['Rent'],
+                                                   'Amount': [-999]}))
+        self.assertEqual(analysis.query.spend('Rent'), 4749)
+        self.assertEqual(len(analysis.view), len(self.df) + 1)
+        self.assertEqual(analysis.aggregates.monthly_totals()['total_expenses'].iloc[-1], 999)
+
+    def test_aggregates_only_analysis_has_no_query(self):
+        analysis = ExpenseAnalysis(None, ExpenseAnalysis(self.df).aggregates)
+        analysis.append_transactions(pd.DataFrame({'Date': pd.to_datetime(['2024-05-01']), 'Category': ['Rent'],
+                                                   'Amount': [-999]}))
+        self.assertEqual(analysis.aggregates.monthly_totals()['total_expenses'].iloc[-1], 999)
+        with self.assertRaises(ValueError):
+            analysis.query
+
+
+if __name__ == '__main__':
+    unittest.main()
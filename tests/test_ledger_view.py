@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.analysis.ledger_view import LedgerView
+
+
+class TestLedgerView(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-05', '2024-03-15', None, '2024-01-20']),
+            'Category': ['Food', None, 'Rent', 'Bills'],
+            'Amount': [-12.5, 100, -3, 0],
+        })
+
+    def test_keys(self):
+        view = LedgerView.from_transactions(self.df)
+        self.assertEqual(list(view.month_codes), [0, 2, -1, 0])
+        self.assertEqual(list(view.months().astype(str)), ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(list(view.categories), ['Bills', 'Food', 'Rent'])
+        self.assertEqual(list(view.category_codes), [1, -1, 2, 0])
+        self.assertEqual(list(view.cents), [-1250, 10000, -300, 0])
+
+    def test_arrays_are_read_only_and_frame_is_untouched(self):
+        original = self.df.copy()
+        view = LedgerView.from_transactions(self.df)
+        for values in (view.month_codes, view.category_codes, view.categories, view.cents):
+            self.assertFalse(values.flags.writeable)
+        pd.testing.assert_frame_equal(self.df, original)
+
+    def test_cents_column_is_shared_without_copy(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2024-01-05']), 'AmountCents': np.array([250], dtype='int32')})
+        view = LedgerView.from_transactions(df)
+        self.assertTrue(np.shares_memory(view.cents, df['AmountCents'].to_numpy()))
+
+    def test_aggregate(self):
+        cube = LedgerView.from_transactions(self.df).aggregate()
+        self.assertEqual(cube['cents'].tolist(), [0, -1250, 10000])
+        self.assertEqual(cube.index.get_level_values('Category')[:2].tolist(), ['Bills', 'Food'])
+        self.assertTrue(pd.isna(cube.index.get_level_values('Category')[2]))
+        self.assertEqual(cube.index.get_level_values('Sign').tolist(), [0, -1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
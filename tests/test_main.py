@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.main import main, parse_args, run
+from src.utils.instrumentation import get_metrics
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.log_file = os.path.join(self.tmp_dir, 'app.log')
+
+    def test_parse_args_adds_report_dependencies(self):
+        args = parse_args(['data/transactions_example.csv', '--stages', 'report'])
+        self.assertEqual(args.stages, {'report', 'summary', 'recommendations', 'goal'})
+
+    def test_parse_args_rejects_unknown_stage(self):
+        with self.assertRaises(SystemExit):
+            parse_args(['--stages', 'summary,nope'])
+
+    @patch('builtins.input')
+    @patch('matplotlib.pyplot.show')
+    def test_headless_run_writes_only_requested_outputs(self, mock_show, mock_input):
+        exit_code = main(['data/transactions_example.csv', '--stages', 'summary,goal,chart',
+                          '--savings-goal', '300', '--output-dir', self.tmp_dir, '--log-file', self.log_file])
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'monthly_expenses_vs_income.png')))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'financial_report.pdf')))
+        mock_input.assert_not_called()
+        mock_show.assert_not_called()
+
+    def test_report_stage(self):
+        exit_code = main(['data/transactions_example.csv', '--stages', 'report', '--savings-goal', '300',
+                          '--output-dir', self.tmp_dir, '--log-file', self.log_file])
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'financial_report.pdf')))
+
+    def test_run_reports_stage_timings(self):
+        args = parse_args(['data/transactions_example.csv', '--stages', 'summary,recommendations',
+                           '--output-dir', self.tmp_dir])
+        pipeline = run(args)
+        self.assertEqual(set(pipeline.timings), {'load', 'aggregate', 'summary', 'recommendations', 'total'})
+
+    @patch('builtins.input')
+    def test_batch_runs_requested_stages_and_reports_failures(self, mock_input):
+        input_dir = os.path.join(self.tmp_dir, 'ledgers')
+        os.makedirs(input_dir)
+        for name in ['alice', 'bob']:
+            shutil.copy('data/transactions_example.csv', os.path.join(input_dir, f'{name}.csv'))
+        with open(os.path.join(input_dir, 'broken.csv'), 'w') as f:
+            f.write("Something,Else\n1,2\n")
+        output_dir = os.path.join(self.tmp_dir, 'out')
+        metrics_file = os.path.join(self.tmp_dir, 'metrics.json')
+        get_metrics().reset()
+
+        exit_code = main([input_dir, '--stages', 'summary,chart', '--output-dir', output_dir, '--workers', '2',
+                          '--metrics', metrics_file, '--log-file', self.log_file])
+        self.assertEqual(exit_code, 1)
+        mock_input.assert_not_called()
+        for account in ['alice', 'bob']:
+            self.assertTrue(os.path.exists(os.path.join(output_dir, account, 'monthly_expenses_vs_income.png')))
+            self.assertFalse(os.path.exists(os.path.join(output_dir, account, 'financial_report.pdf')))
+        with open(metrics_file) as f:
+            metrics = json.load(f)
+        self.assertEqual(metrics['ExpenseAnalysis.monthly_summary']['calls'], 2)
+        self.assertNotIn('ExpenseAnalysis.savings_recommendations', metrics)
+
+if __name__ == '__main__':
+    unittest.main()
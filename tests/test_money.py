@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.utils.money import from_cents, to_cents, transaction_cents
+
+
+class TestMoney(unittest.TestCase):
+
+    def test_to_cents_rounds_half_to_even(self):
+        cents = to_cents(pd.Series([1000, -50.5, 0.125, 0.135]))
+        self.assertEqual(cents.dtype, 'int32')
+        self.assertEqual(list(cents), [100000, -5050, 12, 14])
+        self.assertEqual(cents.name, 'AmountCents')
+
+    def test_to_cents_rejects_missing_and_overflowing_amounts(self):
+        with self.assertRaises(ValueError):
+            to_cents(pd.Series([10.0, np.nan]))
+        with self.assertRaises(ValueError):
+            to_cents(pd.Series([1e17]))
+        with self.assertRaises(ValueError):
+            to_cents(pd.Series([np.iinfo(np.int64).min], dtype='int64'))
+
+    def test_to_cents_widens_large_amounts(self):
+        cents = to_cents(pd.Series([30_000_000, -1], dtype='int64'))
+        self.assertEqual(cents.dtype, 'int64')
+        self.assertEqual(list(cents), [3_000_000_000, -100])
+
+    def test_transaction_cents_prefers_cents_column(self):
+        df = pd.DataFrame({'Amount': [1.0], 'AmountCents': np.array([250], dtype='int32')})
+        self.assertEqual(list(transaction_cents(df)), [250])
+        self.assertEqual(list(transaction_cents(df.drop(columns='AmountCents'))), [100])
+
+    def test_from_cents(self):
+        np.testing.assert_array_equal(from_cents([100000, -5050]), [1000.0, -50.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
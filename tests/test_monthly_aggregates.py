@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.analysis.monthly_aggregates import MonthlyAggregates
+
+
+class TestMonthlyAggregates(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        data = {
+            'Date': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-01-20', '2024-02-10', '2024-02-20', None]),
+            'Category': ['Salary', 'Food', 'Food', 'Rent', 'Food', 'Food'],
+            'Amount': [2000, -100, -50, -800, -150, -999]
+        }
+        cls.df = pd.DataFrame(data)
+        cls.aggregates = MonthlyAggregates.from_transactions(cls.df)
+
+    def test_monthly_totals_match_groupby(self):
+        totals = self.aggregates.monthly_totals()
+        self.assertEqual(list(totals['Month'].astype(str)), ['2024-01', '2024-02'])
+        self.assertEqual(list(totals['total_income']), [2000, 0])
+        self.assertEqual(list(totals['total_expenses']), [150, 950])
+
+    def test_category_totals(self):
+        totals = self.aggregates.category_totals()
+        food = totals[(totals['Month'].astype(str) == '2024-01') & (totals['Category'] == 'Food')]
+        self.assertEqual(food['Amount'].item(), -150)
+
+    def test_income_and_expense_series(self):
+        self.assertEqual(self.aggregates.monthly_income().to_dict(), {pd.Period('2024-01', 'M'): 2000})
+        self.assertEqual(self.aggregates.monthly_expenses().to_dict(),
+                         {pd.Period('2024-01', 'M'): 150, pd.Period('2024-02', 'M'): 950})
+        self.assertEqual(self.aggregates.category_expenses()[(pd.Period('2024-02', 'M'), 'Rent')], 800)
+
+    def test_does_not_mutate_input(self):
+        MonthlyAggregates.from_transactions(self.df)
+        self.assertNotIn('Month', self.df.columns)
+
+    def test_missing_category_column(self):
+        df = self.df.drop(columns=['Category'])
+        totals = MonthlyAggregates.from_transactions(df).monthly_totals()
+        self.assertEqual(list(totals['total_expenses']), [150, 950])
+
+    def test_add_transactions_matches_full_build(self):
+        incremental = MonthlyAggregates.from_transactions(self.df.iloc[:3]).add_transactions(self.df.iloc[3:])
+        pd.testing.assert_frame_equal(incremental.cube, self.aggregates.cube)
+
+    def test_save_and_load_round_trip(self):
+        aggregates = MonthlyAggregates(self.aggregates.cube, {'offset': 42})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_path = os.path.join(tmp_dir, 'state.json')
+            aggregates.save(state_path)
+            loaded = MonthlyAggregates.load(state_path)
+        pd.testing.assert_frame_equal(loaded.cube, aggregates.cube)
+        self.assertEqual(loaded.metadata, {'offset': 42})
+        self.assertEqual(loaded.rows, 5)
+
+    def test_sums_are_exact_integer_cents(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-01'] * 10),
+            'Category': ['Food'] * 10,
+            'Amount': [-0.1] * 10,
+        })
+        aggregates = MonthlyAggregates.from_transactions(df)
+        self.assertEqual(aggregates.cube['cents'].dtype, 'int64')
+        self.assertEqual(aggregates.cube['cents'].item(), -100)
+        self.assertEqual(aggregates.monthly_expenses().item(), 1.0)
+
+    def test_amount_cents_column_matches_amount(self):
+        cents = self.df.drop(columns='Amount').assign(AmountCents=(self.df['Amount'] * 100).astype('int32'))
+        pd.testing.assert_frame_equal(MonthlyAggregates.from_transactions(cents).cube, self.aggregates.cube)
+
+    def test_load_version_1_state(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_path = os.path.join(tmp_dir, 'state.json')
+            with open(state_path, 'w') as f:
+                json.dump({'version': 1, 'metadata': {}, 'cube': {
+                    'Month': ['2024-01'], 'Category': ['Food'], 'Sign': [-1], 'amount': [-12.34], 'count': [2]
+                }}, f)
+            loaded = MonthlyAggregates.load(state_path)
+        self.assertEqual(loaded.cube['cents'].item(), -1234)
+
+if __name__ == '__main__':
+    unittest.main()
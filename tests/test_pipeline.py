@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+from src.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_sibling(results):
+            # Deadlocks (and times out) unless both stages run at the same time
+            barrier.wait()
+            return results['load'] + 1
+
+        pipeline = Pipeline(max_workers=2)
+        pipeline.add('load', lambda results: 1)
+        pipeline.add('chart', wait_for_sibling, ['load'])
+        pipeline.add('goal', wait_for_sibling, ['load'])
+        pipeline.add('report', lambda results: results['chart'] + results['goal'], ['chart', 'goal'])
+        results = pipeline.run()
+
+        self.assertEqual(results, {'load': 1, 'chart': 2, 'goal': 2, 'report': 4})
+        self.assertEqual(set(pipeline.timings), {'load', 'chart', 'goal', 'report', 'total'})
+
+    def test_runs_only_stages_needed_for_targets(self):
+        calls = []
+        pipeline = Pipeline()
+        pipeline.add('load', lambda results: calls.append('load'))
+        pipeline.add('summary', lambda results: calls.append('summary'), ['load'])
+        pipeline.add('fx', lambda results: calls.append('fx'))
+        results = pipeline.run(['summary'])
+        self.assertEqual(calls, ['load', 'summary'])
+        self.assertEqual(set(results), {'load', 'summary'})
+
+    def test_rejects_cycles_and_unknown_stages(self):
+        pipeline = Pipeline()
+        pipeline.add('a', lambda results: None, ['b'])
+        pipeline.add('b', lambda results: None, ['a'])
+        pipeline.add('c', lambda results: None, ['missing'])
+        with self.assertRaisesRegex(ValueError, 'cycle'):
+            pipeline.order(['a'])
+        with self.assertRaisesRegex(ValueError, 'Unknown stage: missing'):
+            pipeline.order(['c'])
+
+    def test_failure_stops_dependent_stages(self):
+        calls = []
+
+        def fail(results):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline()
+        pipeline.add('load', fail)
+        pipeline.add('report', lambda results: calls.append('report'), ['load'])
+        pipeline.add('fx', lambda results: time.sleep(0.05))
+        with self.assertRaisesRegex(RuntimeError, 'boom'):
+            pipeline.run()
+        self.assertEqual(calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,18 @@
+import unittest
+from benchmarks.bench_startup import ENTRY_POINTS, measure
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_entry_points_import_only_allowed_heavy_modules(self):
+        for module, allowed in ENTRY_POINTS.items():
+            with self.subTest(module=module):
+                result = measure(module, repeat=1)
+                self.assertLessEqual(set(result['heavy']), set(allowed))
+
+    def test_main_imports_no_heavy_modules(self):
+        # Import time itself is left to benchmarks/bench_startup, as wall-clock limits are flaky on loaded machines
+        self.assertEqual(measure('src.main', repeat=1)['heavy'], [])
+
+if __name__ == '__main__':
+    unittest.main()